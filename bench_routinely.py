@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Throughput benchmarks for routinely's hot paths.
+
+Run ``python bench_routinely.py import --entries 100000`` (or ``compression``)
+and compare the reported numbers before and after a change; results go to
+stdout only. ``stress`` checks planner invariants on random configs (up to
+``--max-options 10000 --max-sessions 10000``) and can compare an alternative
+planner engine against the current one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import importlib
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+from routinely import (
+    Config,
+    PracticeLog,
+    _build_plan,
+    _load_practice_log,
+    _read_plan_json,
+    _save_practice_log,
+    _write_plan_json,
+    main,
+    zstandard,
+)
+
+
+def _write_config(directory: Path, sessions: int) -> Path:
+    config_path = directory / "bench.json"
+    config = {
+        "options": ["scales", "chords", "songs", "improv", "ear training"],
+        "items_per_session": 4,
+        "max_gap": 2,
+        "sessions": sessions,
+    }
+    config_path.write_text(json.dumps(config), encoding="utf-8")
+    return config_path
+
+
+def _bench_import(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as raw_directory:
+        directory = Path(raw_directory)
+        config_path = _write_config(directory, args.sessions)
+        import_path = directory / "notes.jsonl"
+        with open(import_path, "w", encoding="utf-8") as import_file:
+            for index in range(args.entries):
+                record = {
+                    "session": index % args.sessions + 1,
+                    "notes": f"Played etude {index} at {60 + index % 60}bpm",
+                    "logged_at": (
+                        f"2024-01-01T00:{index // 60 % 60:02d}:{index % 60:02d}"
+                    ),
+                }
+                import_file.write(json.dumps(record) + "\n")
+
+        started = time.perf_counter()
+        main(["log", str(config_path), "import", str(import_path)])
+        elapsed = time.perf_counter() - started
+
+        log_path = config_path.with_suffix(".practice_log.json")
+        load_started = time.perf_counter()
+        _load_practice_log(log_path, args.sessions)
+        load_elapsed = time.perf_counter() - load_started
+
+    print(
+        f"import: {args.entries} entries in {elapsed:.3f}s "
+        f"({args.entries / elapsed:,.0f} entries/s)"
+    )
+    print(
+        f"reload: {args.entries} entries in {load_elapsed:.3f}s "
+        f"({args.entries / load_elapsed:,.0f} entries/s)"
+    )
+
+
+def _bench_compression(args: argparse.Namespace) -> None:
+    suffixes = ["", ".gz", ".bz2", ".xz"] + ([".zst"] if zstandard else [])
+    with tempfile.TemporaryDirectory() as raw_directory:
+        directory = Path(raw_directory)
+        options = [f"Method Book Volume {index}" for index in range(args.options)]
+        config_path = directory / "bench.json"
+        config_path.write_text(
+            json.dumps(
+                {
+                    "options": options,
+                    "items_per_session": 6,
+                    "max_gap": args.options // 6 + 1,
+                    "sessions": args.sessions,
+                }
+            ),
+            encoding="utf-8",
+        )
+        plan, picks = _build_plan(
+            options, 6, args.options // 6 + 1, args.sessions, random.Random(0)
+        )
+        log = PracticeLog(args.sessions)
+        start = datetime.datetime(2024, 1, 1)
+        for index in range(args.entries):
+            log.add_entry(
+                index % args.sessions,
+                f"Played etude {index} at {60 + index % 60}bpm",
+                start + datetime.timedelta(minutes=index),
+            )
+
+        print(f"{'file':<28} {'bytes':>12} {'write s':>9} {'load s':>9}")
+        for suffix in suffixes:
+            plan_path = directory / f"bench.plan.json{suffix}"
+            log_path = directory / f"bench.practice_log.json{suffix}"
+
+            started = time.perf_counter()
+            _write_plan_json(plan_path, plan, picks, "today", str(config_path))
+            _save_practice_log(log_path, log)
+            write_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            _read_plan_json(plan_path, str(config_path), args.sessions, "benchmarking")
+            _load_practice_log(log_path, args.sessions)
+            load_elapsed = time.perf_counter() - started
+
+            size = plan_path.stat().st_size + log_path.stat().st_size
+            label = f"plan+log .json{suffix}"
+            print(f"{label:<28} {size:>12,} {write_elapsed:>9.3f} {load_elapsed:>9.3f}")
+
+
+def _random_config(rng: random.Random, max_options: int, max_sessions: int) -> Config:
+    """Draw a config that the greedy planner can always satisfy.
+
+    Keeping ``options <= items_per_session * (max_gap + 1)`` guarantees every
+    option becomes urgent before too many others do.
+    """
+    option_count = rng.randint(1, max_options)
+    items_per_session = rng.randint(1, min(option_count, 64))
+    min_gap = -(-option_count // items_per_session) - 1
+    return {
+        "options": [f"Option {index:05d}" for index in range(option_count)],
+        "items_per_session": items_per_session,
+        "max_gap": rng.randint(min_gap, min_gap + 8),
+        "sessions": rng.randint(1, max_sessions),
+        "seed": rng.randrange(2**32),
+    }
+
+
+def _plan_violations(
+    config: Config, plan: Sequence[Sequence[str]], picks: Dict[str, int]
+) -> List[str]:
+    """Return descriptions of every planner invariant ``plan`` breaks."""
+    violations: List[str] = []
+    if len(plan) != config["sessions"]:
+        violations.append(f"expected {config['sessions']} sessions, got {len(plan)}")
+
+    last_seen = {option: -1 for option in config["options"]}
+    counts = {option: 0 for option in config["options"]}
+    for index, session in enumerate(plan):
+        if len(session) != config["items_per_session"] or len(set(session)) != len(
+            session
+        ):
+            violations.append(f"session {index + 1} does not have unique items")
+        for option in session:
+            if option not in last_seen:
+                violations.append(f"session {index + 1} has unknown option {option}")
+                continue
+            if index - last_seen[option] - 1 > config["max_gap"]:
+                violations.append(
+                    f"{option} skipped too long before session {index + 1}"
+                )
+            last_seen[option] = index
+            counts[option] += 1
+
+    for option, last_index in last_seen.items():
+        if len(plan) - last_index - 1 > config["max_gap"]:
+            violations.append(f"{option} skipped too long at the end of the plan")
+    if picks != counts:
+        violations.append("picks do not match the plan")
+    if sum(picks.values()) != config["sessions"] * config["items_per_session"]:
+        violations.append("picks do not sum to sessions * items_per_session")
+    return violations
+
+
+def _load_engine(spec: str) -> Callable[..., tuple[List[List[str]], Dict[str, int]]]:
+    module_name, _, function_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), function_name or "_build_plan")
+
+
+def _run_planner(
+    engine: Callable[..., tuple[List[List[str]], Dict[str, int]]], config: Config
+) -> tuple[List[List[str]], Dict[str, int]]:
+    return engine(
+        config["options"],
+        config["items_per_session"],
+        config["max_gap"],
+        config["sessions"],
+        random.Random(config["seed"]),
+    )
+
+
+def _bench_stress(args: argparse.Namespace) -> int:
+    candidate = _load_engine(args.engine) if args.engine else None
+    failures = 0
+    print(
+        f"{'case':>4} {'options':>7} {'items':>5} {'gap':>4} {'sessions':>8} "
+        f"{'time s':>8} {'peak MiB':>9}  result"
+    )
+    for case in range(args.cases):
+        config = _random_config(
+            random.Random(args.seed + case), args.max_options, args.max_sessions
+        )
+
+        started = time.perf_counter()
+        plan, picks = _run_planner(_build_plan, config)
+        elapsed = time.perf_counter() - started
+
+        # The traced rerun doubles as the same-seed determinism check.
+        tracemalloc.start()
+        replay = _run_planner(_build_plan, config)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        problems = _plan_violations(config, plan, picks)
+        if replay != (plan, picks):
+            problems.append("same seed produced a different plan")
+        if candidate is not None and _run_planner(candidate, config) != (plan, picks):
+            problems.append(f"{args.engine} disagrees with routinely._build_plan")
+
+        failures += bool(problems)
+        print(
+            f"{case:>4} {len(config['options']):>7} {config['items_per_session']:>5} "
+            f"{config['max_gap']:>4} {config['sessions']:>8} {elapsed:>8.3f} "
+            f"{peak / 2**20:>9.2f}  {'; '.join(problems[:3]) or 'ok'}"
+        )
+    return 1 if failures else 0
+
+
+def _parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    import_parser = subparsers.add_parser(
+        "import", help="Bulk log import throughput (one load-mutate-save cycle)"
+    )
+    import_parser.add_argument("--entries", type=int, default=100_000)
+    import_parser.add_argument("--sessions", type=int, default=30)
+    import_parser.set_defaults(handler=_bench_import)
+
+    compression_parser = subparsers.add_parser(
+        "compression", help="Plan/log file size and load time per compression suffix"
+    )
+    compression_parser.add_argument("--entries", type=int, default=50_000)
+    compression_parser.add_argument("--sessions", type=int, default=1_000)
+    compression_parser.add_argument("--options", type=int, default=60)
+    compression_parser.set_defaults(handler=_bench_compression)
+
+    stress_parser = subparsers.add_parser(
+        "stress",
+        help="Check planner invariants on random configs, with time and memory",
+    )
+    stress_parser.add_argument("--cases", type=int, default=20)
+    stress_parser.add_argument("--seed", type=int, default=0)
+    stress_parser.add_argument("--max-options", type=int, default=1_000)
+    stress_parser.add_argument("--max-sessions", type=int, default=1_000)
+    stress_parser.add_argument(
+        "--engine",
+        metavar="MODULE:FUNCTION",
+        help="Alternative planner with _build_plan's signature to compare against",
+    )
+    stress_parser.set_defaults(handler=_bench_stress)
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = _parse_args()
+    raise SystemExit(arguments.handler(arguments))
@@ -5,18 +5,224 @@ from __future__ import annotations
 
 import argparse
 import datetime
+import hashlib
 import json
+import sqlite3
+import sys
+import time
 from pathlib import Path
-from typing import Dict, List, Sequence, Tuple
+from typing import Any, Dict, List, Sequence, Tuple
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-from google.cloud.firestore import SERVER_TIMESTAMP
+from routinely import (
+    PracticeLog,
+    PracticeLogEntry,
+    _default_log_path,
+    _default_sync_state_path,
+    _load_config,
+    _load_practice_log,
+    _naive_local,
+    _save_practice_log,
+)
 
 
-def _parse_args() -> argparse.Namespace:
+class LocalDocumentStore:
+    """Offline stand-in for the slice of the Firestore client migrate() uses.
+
+    Documents live in SQLite (in memory unless a path is given) keyed by their
+    slash-separated path. Every ``set``/``get`` counts as one round trip and
+    the JSON size of each written document is added to ``bytes_written``, so
+    migration throughput can be measured without a live project. Each write
+    also stamps the document with the next change sequence number, which
+    ``changes_since`` uses the way sync queries Firestore on ``updatedAt``.
+    """
+
+    SERVER_TIMESTAMP = object()
+
+    def __init__(self, path: Path | str = ":memory:"):
+        self._db = sqlite3.connect(str(path))
+        self.round_trips = 0
+        self.bytes_written = 0
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "path TEXT PRIMARY KEY, parent TEXT NOT NULL, data TEXT NOT NULL)"
+            )
+            columns = self._db.execute("PRAGMA table_info(documents)").fetchall()
+            if "seq" not in {column[1] for column in columns}:
+                self._db.execute(
+                    "ALTER TABLE documents ADD COLUMN seq INTEGER NOT NULL DEFAULT 0"
+                )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS documents_seq ON documents (seq)"
+            )
+
+    def close(self) -> None:
+        self._db.close()
+
+    def collection(self, name: str) -> "LocalCollection":
+        return LocalCollection(self, name)
+
+    def _encode(self, value: Any) -> Any:
+        if value is self.SERVER_TIMESTAMP:
+            return datetime.datetime.now(datetime.timezone.utc).isoformat()
+        if isinstance(value, datetime.datetime):
+            return value.isoformat()
+        raise TypeError(f"Unsupported document value: {value!r}")
+
+    def _set(self, path: str, data: Dict[str, Any], merge: bool = False) -> None:
+        self.round_trips += 1
+        with self._db:
+            if merge:
+                row = self._db.execute(
+                    "SELECT data FROM documents WHERE path = ?", (path,)
+                ).fetchone()
+                if row:
+                    data = {**json.loads(row[0]), **data}
+            payload = json.dumps(data, default=self._encode, sort_keys=True)
+            self.bytes_written += len(payload.encode("utf-8"))
+            self._db.execute(
+                "INSERT OR REPLACE INTO documents (path, parent, data, seq) "
+                "VALUES (?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM documents))",
+                (path, path.rsplit("/", 1)[0], payload),
+            )
+
+    def _get(self, path: str) -> Dict[str, Any] | None:
+        self.round_trips += 1
+        row = self._db.execute(
+            "SELECT data FROM documents WHERE path = ?", (path,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _list(self, parent: str) -> List[Tuple[str, Dict[str, Any]]]:
+        self.round_trips += 1
+        return [
+            (path.rsplit("/", 1)[1], json.loads(data))
+            for path, data in self._db.execute(
+                "SELECT path, data FROM documents WHERE parent = ? ORDER BY path",
+                (parent,),
+            )
+        ]
+
+    def _changes(
+        self, plan_path: str, after: int
+    ) -> Tuple[List[Tuple[str, Dict[str, Any]]], int]:
+        # Like the Firestore query sync runs, only documents stamped with this
+        # plan's planPath and an updatedAt are seen.
+        self.round_trips += 1
+        prefix = f"{plan_path}/"
+        rows = self._db.execute(
+            "SELECT path, data, seq FROM documents "
+            "WHERE seq > ? AND substr(path, 1, ?) = ? ORDER BY seq",
+            (after, len(prefix), prefix),
+        ).fetchall()
+        latest = rows[-1][2] if rows else after
+        changes = []
+        for path, payload, _ in rows:
+            data = json.loads(payload)
+            if data.get("planPath") == plan_path and "updatedAt" in data:
+                changes.append((path[len(prefix) :], data))
+        return changes, latest
+
+
+class LocalCollection:
+    def __init__(self, store: LocalDocumentStore, path: str):
+        self._store = store
+        self.path = path
+
+    def document(self, document_id: str) -> "LocalDocument":
+        return LocalDocument(self._store, f"{self.path}/{document_id}")
+
+    def documents(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return (document id, data) for every document in the collection."""
+        return self._store._list(self.path)
+
+
+class LocalDocument:
+    def __init__(self, store: LocalDocumentStore, path: str):
+        self._store = store
+        self.path = path
+
+    def collection(self, name: str) -> LocalCollection:
+        return LocalCollection(self._store, f"{self.path}/{name}")
+
+    def set(self, data: Dict[str, Any], merge: bool = False) -> None:
+        self._store._set(self.path, data, merge)
+
+    def get(self) -> Dict[str, Any] | None:
+        return self._store._get(self.path)
+
+    def changes_since(
+        self, cursor: int | None
+    ) -> Tuple[List[Tuple[str, Dict[str, Any]]], int]:
+        """Return (path below this document, data) written after ``cursor``.
+
+        The second item is the cursor to pass next time.
+        """
+        return self._store._changes(self.path, cursor or 0)
+
+
+def _firestore_client() -> Tuple[Any, Any]:
+    """Return a Firestore client and its SERVER_TIMESTAMP sentinel."""
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    from google.cloud.firestore import SERVER_TIMESTAMP
+
+    if not firebase_admin._apps:
+        cred = credentials.ApplicationDefault()
+        firebase_admin.initialize_app(cred)
+    return firestore.client(), SERVER_TIMESTAMP
+
+
+def _parse_sync_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="migrate_to_firestore.py sync",
+        description=(
+            "Pull practice log changes made on other devices into the local log "
+            "and push local changes, exchanging only what changed since last sync"
+        ),
+    )
+    parser.add_argument("--user-id", required=True, help="Firestore user id")
+    parser.add_argument(
+        "--plan-id", required=True, help="Plan document id under users/{user-id}/plans"
+    )
+    parser.add_argument(
+        "--config",
+        required=True,
+        type=Path,
+        help="Path to the routine config JSON (for the session count)",
+    )
+    parser.add_argument(
+        "--log-json",
+        type=Path,
+        help="Path to the practice log JSON (defaults to alongside config)",
+    )
+    parser.add_argument(
+        "--state",
+        type=Path,
+        help=(
+            "Sync cursor file (defaults to config.sync.json; pass the same path "
+            "to 'log archive --sync-state')"
+        ),
+    )
+    parser.add_argument(
+        "--local-store",
+        metavar="PATH",
+        help="Sync with a local SQLite document store instead of Firestore",
+    )
+    arguments = parser.parse_args(argv)
+    arguments.command = "sync"
+    return arguments
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    if argv[:1] == ["sync"]:
+        return _parse_sync_args(argv[1:])
+
     parser = argparse.ArgumentParser(
-        description="Upload a generated plan and practice log JSON to Firestore"
+        description=(
+            "Upload a generated plan and practice log JSON to Firestore "
+            "(or run 'sync' to keep a practice log in step with it)"
+        )
     )
     parser.add_argument(
         "--user-id",
@@ -45,7 +251,17 @@ def _parse_args() -> argparse.Namespace:
         "--plan-id",
         help="Optional Firestore document id for the plan (defaults to config name + generated_on)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--local-store",
+        metavar="PATH",
+        help=(
+            "Write into a local SQLite document store instead of Firestore "
+            "(use :memory: for a dry run) and report round trips and bytes"
+        ),
+    )
+    arguments = parser.parse_args(argv)
+    arguments.command = "migrate"
+    return arguments
 
 
 def _load_json(path: Path) -> dict:
@@ -85,7 +301,9 @@ def _load_log(path: Path) -> Tuple[Dict[int, datetime.datetime | None], List[dic
                 "entry_id": int(entry["entry_id"]),
                 "session_index": int(entry["session_index"]),
                 "notes": str(entry["notes"]),
-                "logged_at": datetime.datetime.fromisoformat(entry["logged_at"]),
+                "logged_at": _naive_local(
+                    datetime.datetime.fromisoformat(entry["logged_at"])
+                ),
             }
         )
 
@@ -99,15 +317,16 @@ def _plan_id(args: argparse.Namespace, plan: dict) -> str:
     return f"{args.config.stem}-{generated_on_safe}"
 
 
-def migrate(args: argparse.Namespace) -> None:
+def migrate(
+    args: argparse.Namespace, db: Any = None, server_timestamp: Any = None
+) -> None:
+    """Copy the plan and log to ``db`` (a Firestore client unless given)."""
     plan = _load_plan(args.plan_json)
     done_sessions, entries = _load_log(args.log_json)
 
-    if not firebase_admin._apps:
-        cred = credentials.ApplicationDefault()
-        firebase_admin.initialize_app(cred)
+    if db is None:
+        db, server_timestamp = _firestore_client()
 
-    db = firestore.client()
     plan_doc_id = _plan_id(args, plan)
     plan_ref = (
         db.collection("users")
@@ -116,6 +335,8 @@ def migrate(args: argparse.Namespace) -> None:
         .document(plan_doc_id)
     )
 
+    # Stamped like sync's writes so that sync's change query sees these docs.
+    stamp = {"planPath": plan_ref.path, "updatedAt": server_timestamp}
     plan_ref.set(
         {
             "generatedOn": plan["generated_on"],
@@ -128,7 +349,7 @@ def migrate(args: argparse.Namespace) -> None:
                 "planJson": str(args.plan_json),
                 "logJson": str(args.log_json),
             },
-            "migratedAt": SERVER_TIMESTAMP,
+            "migratedAt": server_timestamp,
         }
     )
 
@@ -143,6 +364,7 @@ def migrate(args: argparse.Namespace) -> None:
                 "items": items,
                 "done": completed_at is not None,
                 "completedAt": completed_at,
+                **stamp,
             }
         )
 
@@ -150,11 +372,14 @@ def migrate(args: argparse.Namespace) -> None:
             entry for entry in entries if entry["session_index"] == index
         ]
         for entry in log_entries:
-            session_ref.collection("logs").document(str(entry["entry_id"])).set(
+            session_ref.collection("logs").document(_entry_key(entry)).set(
                 {
                     "entryId": entry["entry_id"],
+                    "sessionIndex": index,
                     "notes": entry["notes"],
                     "loggedAt": entry["logged_at"],
+                    "deleted": False,
+                    **stamp,
                 }
             )
 
@@ -164,5 +389,286 @@ def migrate(args: argparse.Namespace) -> None:
     )
 
 
+def _migrate_locally(args: argparse.Namespace) -> None:
+    store = LocalDocumentStore(args.local_store)
+    started = time.perf_counter()
+    try:
+        migrate(args, store, LocalDocumentStore.SERVER_TIMESTAMP)
+    finally:
+        store.close()
+    elapsed = time.perf_counter() - started
+    print(
+        f"Local store: {store.round_trips} round trips, "
+        f"{store.bytes_written:,} bytes written in {elapsed:.3f}s"
+    )
+
+
+def _entry_key(entry: PracticeLogEntry) -> str:
+    """Remote id for a log entry, the same on every device that holds it.
+
+    Entry ids are assigned per device and can collide, so entries are keyed by
+    their content instead (notes are never edited, only added or deleted).
+    """
+    material = (
+        f"{entry['session_index']}|{entry['logged_at'].isoformat()}|{entry['notes']}"
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:20]
+
+
+def _load_sync_state(path: Path, plan_path: str) -> Dict[str, Any]:
+    """Return the sync state kept for one remote plan document.
+
+    ``cursor`` marks the newest remote change already pulled, ``entries`` maps
+    local entry ids to their document path below the plan as of the last sync
+    (so local deletions can be told apart from entries never pushed) and
+    ``done`` lists synced completions.
+    """
+    states = _load_json(path) if path.exists() else {}
+    state = states.get(plan_path, {})
+    return {
+        "cursor": state.get("cursor"),
+        "entries": {int(key): value for key, value in state.get("entries", {}).items()},
+        "done": set(state.get("done", [])),
+    }
+
+
+def _save_sync_state(path: Path, plan_path: str, state: Dict[str, Any]) -> None:
+    states = _load_json(path) if path.exists() else {}
+    states[plan_path] = {
+        "cursor": state["cursor"],
+        "entries": {str(key): value for key, value in sorted(state["entries"].items())},
+        "done": sorted(state["done"]),
+    }
+    path.write_text(json.dumps(states, indent=2) + "\n", encoding="utf-8")
+
+
+def _firestore_changes(
+    db: Any, plan_ref: Any, cursor: str | None
+) -> Tuple[List[Tuple[str, Dict[str, Any]]], str | None]:
+    """Query Firestore for session/log documents under ``plan_ref`` updated after
+    ``cursor`` (needs collection-group indexes on planPath + updatedAt)."""
+    since = (
+        datetime.datetime.fromisoformat(cursor)
+        if cursor
+        else datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+    )
+    changes: List[Tuple[str, Dict[str, Any]]] = []
+    latest = cursor
+    for group in ("sessions", "logs"):
+        query = (
+            db.collection_group(group)
+            .where("planPath", "==", plan_ref.path)
+            .where("updatedAt", ">", since)
+            .order_by("updatedAt")
+        )
+        for snapshot in query.stream():
+            data = snapshot.to_dict()
+            changes.append((snapshot.reference.path[len(plan_ref.path) + 1 :], data))
+            stamp = data["updatedAt"].isoformat()
+            latest = max(latest, stamp) if latest else stamp
+    return changes, latest
+
+
+def _document(plan_ref: Any, path: str) -> Any:
+    """Resolve a ``collection/document/...`` path below ``plan_ref``."""
+    parts = path.split("/")
+    ref = plan_ref
+    for collection, document_id in zip(parts[::2], parts[1::2]):
+        ref = ref.collection(collection).document(document_id)
+    return ref
+
+
+def _as_naive_datetime(value: Any) -> datetime.datetime:
+    """Read a remote timestamp (ISO string or Firestore datetime) as pushed.
+
+    Firestore stores the naive datetimes sync pushes as if they were UTC and
+    hands them back tagged UTC, so the wall-clock value is kept and only the
+    tag is dropped; converting to local time would shift every timestamp by
+    the host's offset and change the entry keys.
+    """
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    return value.replace(tzinfo=None)
+
+
+def _pull_changes(
+    log: PracticeLog,
+    state: Dict[str, Any],
+    changes: Sequence[Tuple[str, Dict[str, Any]]],
+) -> int:
+    """Apply remote changes to ``log``; return how many altered it.
+
+    A remote entry not tracked yet is matched by content against local
+    entries that were never synced (the same note already logged here, or
+    uploaded by migrate) before it is added as a new entry.
+    """
+    path_to_id = {path: entry_id for entry_id, path in state["entries"].items()}
+    unsynced: Dict[str, int] | None = None
+    applied = 0
+    for path, data in changes:
+        parts = path.split("/")
+        if parts[0] != "sessions" or len(parts) not in (2, 4):
+            continue
+        session_index = int(data.get("sessionIndex", parts[1]))
+        if not 0 <= session_index < log.session_count:
+            print(f"Skipping remote change outside this plan: {path}")
+            continue
+
+        if len(parts) == 2:
+            if not data.get("done"):
+                continue
+            if not log.is_done(session_index):
+                completed_at = data.get("completedAt")
+                log.mark_done(
+                    session_index,
+                    _as_naive_datetime(completed_at) if completed_at else None,
+                )
+                applied += 1
+            state["done"].add(session_index)
+            continue
+
+        entry_id = path_to_id.get(path)
+        if data.get("deleted"):
+            if entry_id is not None:
+                del state["entries"][entry_id]
+                try:
+                    log.remove_entry(entry_id)
+                    applied += 1
+                except ValueError:
+                    pass  # Deleted on both sides.
+            continue
+        if entry_id is not None:
+            continue
+        if unsynced is None:
+            unsynced = {
+                _entry_key(entry): entry["entry_id"]
+                for entry in log.all_entries()
+                if entry["entry_id"] not in state["entries"]
+            }
+        remote: PracticeLogEntry = {
+            "entry_id": 0,
+            "session_index": session_index,
+            "notes": str(data["notes"]),
+            "logged_at": _as_naive_datetime(data["loggedAt"]),
+        }
+        entry_id = unsynced.pop(_entry_key(remote), None)
+        if entry_id is None:
+            entry_id = log.add_entry(
+                session_index, remote["notes"], remote["logged_at"]
+            )["entry_id"]
+            applied += 1
+        state["entries"][entry_id] = path
+        path_to_id[path] = entry_id
+    return applied
+
+
+def _push_changes(
+    log: PracticeLog, state: Dict[str, Any], plan_ref: Any, server_timestamp: Any
+) -> int:
+    """Write local entries, deletions and completions the remote lacks."""
+    stamp = {"planPath": plan_ref.path, "updatedAt": server_timestamp}
+    pushed = 0
+    local_entries = {entry["entry_id"]: entry for entry in log.all_entries()}
+
+    for entry_id in [i for i in state["entries"] if i not in local_entries]:
+        _document(plan_ref, state["entries"].pop(entry_id)).set(
+            {"deleted": True, **stamp}, merge=True
+        )
+        pushed += 1
+
+    for entry_id, entry in local_entries.items():
+        if entry_id in state["entries"]:
+            continue
+        path = f"sessions/{entry['session_index']:02d}/logs/{_entry_key(entry)}"
+        _document(plan_ref, path).set(
+            {
+                "entryId": entry_id,
+                "sessionIndex": entry["session_index"],
+                "notes": entry["notes"],
+                "loggedAt": entry["logged_at"],
+                "deleted": False,
+                **stamp,
+            }
+        )
+        state["entries"][entry_id] = path
+        pushed += 1
+
+    for session_index, completed_at in sorted(log.done_sessions().items()):
+        if session_index in state["done"]:
+            continue
+        _document(plan_ref, f"sessions/{session_index:02d}").set(
+            {
+                "sessionIndex": session_index,
+                "done": True,
+                "completedAt": completed_at,
+                **stamp,
+            },
+            merge=True,
+        )
+        state["done"].add(session_index)
+        pushed += 1
+    return pushed
+
+
+def sync(
+    args: argparse.Namespace, db: Any = None, server_timestamp: Any = None
+) -> None:
+    """Exchange practice log changes with ``db`` (a Firestore client unless given).
+
+    Only documents changed since the cursor saved by the previous sync are
+    pulled, and only local changes since then are pushed, so the number of
+    reads and writes follows the amount of change rather than the log size.
+    """
+    config = _load_config(str(args.config))
+    log_path = args.log_json or _default_log_path(str(args.config))
+    state_path = args.state or _default_sync_state_path(str(args.config))
+    log = _load_practice_log(log_path, config["sessions"])
+
+    if db is None:
+        db, server_timestamp = _firestore_client()
+    plan_ref = (
+        db.collection("users")
+        .document(args.user_id)
+        .collection("plans")
+        .document(args.plan_id)
+    )
+    state = _load_sync_state(state_path, plan_ref.path)
+
+    if hasattr(plan_ref, "changes_since"):
+        changes, cursor = plan_ref.changes_since(state["cursor"])
+    else:
+        changes, cursor = _firestore_changes(db, plan_ref, state["cursor"])
+    pulled = _pull_changes(log, state, changes)
+    pushed = _push_changes(log, state, plan_ref, server_timestamp)
+    # Our own writes come back once on the next pull and are recognised there.
+    state["cursor"] = cursor
+
+    if pulled:
+        _save_practice_log(log_path, log)
+    _save_sync_state(state_path, plan_ref.path, state)
+    print(
+        f"Synced {log_path} with {plan_ref.path}: "
+        f"{len(changes)} remote changes read, {pulled} applied, {pushed} pushed."
+    )
+
+
+def _sync_locally(args: argparse.Namespace) -> None:
+    store = LocalDocumentStore(args.local_store)
+    try:
+        sync(args, store, LocalDocumentStore.SERVER_TIMESTAMP)
+    finally:
+        store.close()
+    print(f"Local store: {store.round_trips} round trips")
+
+
 if __name__ == "__main__":
-    migrate(_parse_args())
+    arguments = _parse_args(sys.argv[1:])
+    if arguments.command == "sync":
+        if arguments.local_store:
+            _sync_locally(arguments)
+        else:
+            sync(arguments)
+    elif arguments.local_store:
+        _migrate_locally(arguments)
+    else:
+        migrate(arguments)
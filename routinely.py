@@ -4,13 +4,68 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import bz2
+import concurrent.futures
+import csv
 import datetime
+import gzip
 import hashlib
+import heapq
+import html
+import io
+import itertools
 import json
+import lzma
 import random
+import re
+import shutil
+import sqlite3
 import sys
+import threading
+import time
+import types
+import zlib
 from pathlib import Path
-from typing import Dict, List, Mapping, NotRequired, Sequence, TypedDict
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NotRequired,
+    Sequence,
+    Set,
+    TypedDict,
+)
+
+try:
+    import curses
+except ImportError:  # pragma: no cover - not available on Windows
+    curses = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+# "shared" draws every session from one sequential RNG (the original scheme);
+# "session" gives each session its own stream, see SessionStreams.
+_RNG_SCHEMES = {"shared", "session"}
+# Files kept next to a config (plan, log, next cursor, sync state); batch
+# generate must not mistake them for configs.
+_SIDECAR_SUFFIXES = (".plan.json", ".practice_log.json", ".cursor.json", ".sync.json")
 
 
 class Config(TypedDict):
@@ -19,6 +74,8 @@ class Config(TypedDict):
     max_gap: int
     sessions: int
     seed: NotRequired[int]
+    rng: NotRequired[str]
+    weights: NotRequired[Dict[str, float]]
 
 
 class PracticeLogEntry(TypedDict):
@@ -28,8 +85,53 @@ class PracticeLogEntry(TypedDict):
     logged_at: datetime.datetime
 
 
+class _DoneSessionRecord(TypedDict):
+    session_index: int
+    completed_at: NotRequired[datetime.datetime | None]
+
+
+class _PracticeLogFile(TypedDict):
+    """On-disk log layout used for typed decoding when msgspec is installed."""
+
+    next_id: NotRequired[int]
+    done_sessions: NotRequired[List[_DoneSessionRecord | int]]
+    entries: NotRequired[List[PracticeLogEntry]]
+
+
+def _tokenize(text: str) -> Set[str]:
+    return set(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def _naive_local(value: datetime.datetime) -> datetime.datetime:
+    """Return ``value`` as naive local time, the form every log timestamp uses."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+class PracticeStats(TypedDict):
+    session_count: int
+    done_count: int
+    completion_rate: float
+    entry_count: int
+    sessions_with_notes: int
+    notes_per_session: float
+    longest_streak: int
+    first_done_at: datetime.datetime | None
+    last_done_at: datetime.datetime | None
+    option_counts: Dict[str, int]
+
+
 class PracticeLog:
-    """Store practice logs tied to specific session rows."""
+    """Store practice logs tied to specific session rows.
+
+    Aggregates used by ``stats`` (note counts, done streaks, first/last completion
+    and per-option practice counts once a plan is attached) are maintained as
+    entries and completions change, so reading them never walks the log. They
+    live only in memory and are rebuilt while a log file is loaded. Notes
+    are also kept in an inverted token index for ``search`` (built on the first
+    search) and in a list sorted by ``logged_at`` for ``entries_between``.
+    """
 
     def __init__(
         self,
@@ -48,18 +150,45 @@ class PracticeLog:
         self._entries_by_id: Dict[int, PracticeLogEntry] = {}
         self._done_sessions: Dict[int, datetime.datetime | None] = {}
         self._next_id = max(1, next_id)
+        self._ids_sorted = True
+        self._sessions_with_notes = 0
+        self._run_end_by_start: Dict[int, int] = {}
+        self._run_start_by_end: Dict[int, int] = {}
+        self._longest_streak = 0
+        self._first_done_at: datetime.datetime | None = None
+        self._last_done_at: datetime.datetime | None = None
+        self._session_items: List[Sequence[str]] | None = None
+        self._option_counts: Dict[str, int] = {}
+        # Built on the first search, so commands that never search skip tokenizing.
+        self._token_index: Dict[str, Set[int]] | None = None
+        self._time_index: List[tuple[datetime.datetime, int]] = []
 
         for entry in entries or []:
             self._store_entry(entry)
+        # Loaded entries are often out of time order (imports, sync pulls), so
+        # sort once here; only add_entry inserts into the index one at a time.
+        self._time_index = sorted(
+            (entry["logged_at"], entry["entry_id"])
+            for bucket in self._entries
+            for entry in bucket
+        )
 
         for session_index, completed_at in done_sessions or []:
             self._validate_session_index(session_index)
-            self._done_sessions[session_index] = completed_at
+            self._record_done(session_index, completed_at)
 
         self._next_id = max(
             self._next_id, (max(self._entries_by_id) + 1) if self._entries_by_id else 1
         )
 
+    @property
+    def session_count(self) -> int:
+        return self._session_count
+
+    @property
+    def next_id(self) -> int:
+        return self._next_id
+
     def _validate_session_index(self, session_index: int) -> None:
         if not 0 <= session_index < self._session_count:
             raise ValueError(
@@ -69,8 +198,65 @@ class PracticeLog:
 
     def _store_entry(self, entry: PracticeLogEntry) -> None:
         self._validate_session_index(entry["session_index"])
-        self._entries[entry["session_index"]].append(entry)
+        entry["logged_at"] = _naive_local(entry["logged_at"])
+        bucket = self._entries[entry["session_index"]]
+        if not bucket:
+            self._sessions_with_notes += 1
+        bucket.append(entry)
+        if self._entries_by_id and entry["entry_id"] < next(
+            reversed(self._entries_by_id)
+        ):
+            self._ids_sorted = False
         self._entries_by_id[entry["entry_id"]] = entry
+        if self._token_index is not None:
+            self._index_notes(self._token_index, entry)
+
+    @staticmethod
+    def _index_notes(token_index: Dict[str, Set[int]], entry: PracticeLogEntry) -> None:
+        for token in _tokenize(entry["notes"]):
+            token_index.setdefault(token, set()).add(entry["entry_id"])
+
+    def _record_done(
+        self, session_index: int, completed_at: datetime.datetime | None
+    ) -> None:
+        if completed_at is not None:
+            completed_at = _naive_local(completed_at)
+        if session_index in self._done_sessions:
+            self._done_sessions[session_index] = completed_at
+            return
+        self._done_sessions[session_index] = completed_at
+
+        # Merge the runs of consecutive done sessions on either side.
+        start = self._run_start_by_end.pop(session_index - 1, session_index)
+        end = self._run_end_by_start.pop(session_index + 1, session_index)
+        self._run_end_by_start[start] = end
+        self._run_start_by_end[end] = start
+        self._longest_streak = max(self._longest_streak, end - start + 1)
+
+        if completed_at is not None:
+            if self._first_done_at is None or completed_at < self._first_done_at:
+                self._first_done_at = completed_at
+            if self._last_done_at is None or completed_at > self._last_done_at:
+                self._last_done_at = completed_at
+
+        if self._session_items is not None:
+            for option in self._session_items[session_index]:
+                self._option_counts[option] = self._option_counts.get(option, 0) + 1
+
+    def attach_plan(self, plan: Sequence[Sequence[str]]) -> None:
+        """Join plan rows so per-option practice counts track done sessions."""
+        if len(plan) != self._session_count:
+            raise ValueError(
+                f"Plan has {len(plan)} sessions but the log tracks "
+                f"{self._session_count}"
+            )
+        self._session_items = [list(session) for session in plan]
+        self._option_counts = {
+            option: 0 for session in self._session_items for option in session
+        }
+        for session_index in self._done_sessions:
+            for option in self._session_items[session_index]:
+                self._option_counts[option] += 1
 
     def mark_done(
         self, session_index: int, completed_at: datetime.datetime | None = None
@@ -78,7 +264,7 @@ class PracticeLog:
         self._validate_session_index(session_index)
         if session_index in self._done_sessions:
             return False
-        self._done_sessions[session_index] = completed_at or datetime.datetime.now()
+        self._record_done(session_index, completed_at or datetime.datetime.now())
         return True
 
     def done_at(self, session_index: int) -> datetime.datetime | None:
@@ -107,6 +293,7 @@ class PracticeLog:
         }
         self._next_id += 1
         self._store_entry(entry)
+        bisect.insort(self._time_index, (entry["logged_at"], entry["entry_id"]))
         return entry
 
     def entries_for(self, session_index: int) -> List[PracticeLogEntry]:
@@ -114,7 +301,10 @@ class PracticeLog:
         return list(self._entries[session_index])
 
     def all_entries(self) -> List[PracticeLogEntry]:
-        return [self._entries_by_id[key] for key in sorted(self._entries_by_id)]
+        if not self._ids_sorted:
+            self._entries_by_id = dict(sorted(self._entries_by_id.items()))
+            self._ids_sorted = True
+        return list(self._entries_by_id.values())
 
     def remove_entry(self, entry_id: int) -> PracticeLogEntry:
         entry = self._entries_by_id.pop(entry_id, None)
@@ -126,9 +316,88 @@ class PracticeLog:
             if candidate["entry_id"] == entry_id:
                 del bucket[index]
                 break
+        if not bucket:
+            self._sessions_with_notes -= 1
+
+        if self._token_index is not None:
+            for token in _tokenize(entry["notes"]):
+                ids = self._token_index.get(token)
+                if ids is not None:
+                    ids.discard(entry_id)
+                    if not ids:
+                        del self._token_index[token]
+
+        key = (entry["logged_at"], entry_id)
+        position = bisect.bisect_left(self._time_index, key)
+        if position < len(self._time_index) and self._time_index[position] == key:
+            del self._time_index[position]
 
         return entry
 
+    def entries_between(
+        self,
+        start: datetime.datetime | None = None,
+        end: datetime.datetime | None = None,
+    ) -> List[PracticeLogEntry]:
+        """Return entries logged in ``[start, end)`` ordered by ``logged_at``."""
+        start = None if start is None else _naive_local(start)
+        end = None if end is None else _naive_local(end)
+        low = 0 if start is None else bisect.bisect_left(self._time_index, (start,))
+        high = (
+            len(self._time_index)
+            if end is None
+            else bisect.bisect_left(self._time_index, (end,))
+        )
+        return [
+            self._entries_by_id[entry_id]
+            for _, entry_id in self._time_index[low:high]
+        ]
+
+    def search(
+        self, query: str, session_index: int | None = None
+    ) -> List[PracticeLogEntry]:
+        """Return entries whose notes contain every word in ``query``, by id."""
+        if session_index is not None:
+            self._validate_session_index(session_index)
+        if self._token_index is None:
+            self._token_index = {}
+            for entry in self._entries_by_id.values():
+                self._index_notes(self._token_index, entry)
+        token_index = self._token_index
+        tokens = sorted(
+            _tokenize(query), key=lambda token: len(token_index.get(token, ()))
+        )
+        if not tokens:
+            return []
+
+        matches = set(token_index.get(tokens[0], ()))
+        for token in tokens[1:]:
+            if not matches:
+                break
+            matches &= token_index.get(token, set())
+
+        return [
+            self._entries_by_id[entry_id]
+            for entry_id in sorted(matches)
+            if session_index is None
+            or self._entries_by_id[entry_id]["session_index"] == session_index
+        ]
+
+    def stats(self) -> PracticeStats:
+        entry_count = len(self._entries_by_id)
+        return {
+            "session_count": self._session_count,
+            "done_count": len(self._done_sessions),
+            "completion_rate": len(self._done_sessions) / self._session_count,
+            "entry_count": entry_count,
+            "sessions_with_notes": self._sessions_with_notes,
+            "notes_per_session": entry_count / self._session_count,
+            "longest_streak": self._longest_streak,
+            "first_done_at": self._first_done_at,
+            "last_done_at": self._last_done_at,
+            "option_counts": dict(self._option_counts),
+        }
+
     def to_json(self) -> Dict[str, object]:
         return {
             "next_id": self._next_id,
@@ -166,17 +435,238 @@ def _default_plan_path(config_path: str) -> Path:
     return Path(config_path).with_suffix(".plan.json")
 
 
-def _load_practice_log(path: Path, session_count: int) -> PracticeLog:
-    path = Path(path)
-    if not path.exists():
-        return PracticeLog(session_count)
+class RoutinePaths(TypedDict):
+    config: Path
+    plan_json: Path
+    log_file: Path
+
+
+_DEFAULT_STORE = Path.home() / ".routinely"
+_STORE_ID_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+
+class RoutineStore:
+    """Routines for many users under ``users/{user}/plans/{plan}`` on disk.
+
+    The layout mirrors the Firestore hierarchy used by migrate_to_firestore.py.
+    A SQLite index records every user's plans and active plan, so resolving a
+    routine is a keyed lookup instead of a directory scan.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.root / "index.sqlite3")
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "user_id TEXT PRIMARY KEY, active_plan TEXT)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                "user_id TEXT NOT NULL, plan_id TEXT NOT NULL, "
+                "created_at TEXT NOT NULL, PRIMARY KEY (user_id, plan_id))"
+            )
+
+    def close(self) -> None:
+        self._db.close()
+
+    @staticmethod
+    def _validate_id(kind: str, value: str) -> None:
+        if not _STORE_ID_PATTERN.fullmatch(value):
+            raise ValueError(
+                f"{kind} id must use letters, digits, '.', '_' or '-', got {value!r}"
+            )
+
+    def _paths(self, user_id: str, plan_id: str) -> RoutinePaths:
+        directory = self.root / "users" / user_id / "plans" / plan_id
+        return {
+            "config": directory / "config.json",
+            "plan_json": directory / "plan.json",
+            "log_file": directory / "practice_log.json",
+        }
+
+    def add_plan(
+        self,
+        user_id: str,
+        plan_id: str,
+        config_path: Path,
+        plan_json: Path | None = None,
+        log_file: Path | None = None,
+        activate: bool = True,
+    ) -> RoutinePaths:
+        """Copy a config (and optionally its plan and log) into the store."""
+        self._validate_id("user", user_id)
+        self._validate_id("plan", plan_id)
+        paths = self._paths(user_id, plan_id)
+        paths["config"].parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(config_path, paths["config"])
+        if plan_json is not None:
+            shutil.copyfile(plan_json, paths["plan_json"])
+        if log_file is not None:
+            shutil.copyfile(log_file, paths["log_file"])
+
+        with self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO plans (user_id, plan_id, created_at) "
+                "VALUES (?, ?, ?)",
+                (user_id, plan_id, datetime.datetime.now().isoformat()),
+            )
+            self._db.execute(
+                "INSERT OR IGNORE INTO users (user_id, active_plan) VALUES (?, NULL)",
+                (user_id,),
+            )
+            if activate:
+                self._db.execute(
+                    "UPDATE users SET active_plan = ? WHERE user_id = ?",
+                    (plan_id, user_id),
+                )
+        return paths
+
+    def activate(self, user_id: str, plan_id: str) -> None:
+        if not self._has_plan(user_id, plan_id):
+            raise ValueError(f"No plan {plan_id!r} for user {user_id!r}")
+        with self._db:
+            self._db.execute(
+                "UPDATE users SET active_plan = ? WHERE user_id = ?",
+                (plan_id, user_id),
+            )
+
+    def active_plan(self, user_id: str) -> str | None:
+        row = self._db.execute(
+            "SELECT active_plan FROM users WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _has_plan(self, user_id: str, plan_id: str) -> bool:
+        row = self._db.execute(
+            "SELECT 1 FROM plans WHERE user_id = ? AND plan_id = ?",
+            (user_id, plan_id),
+        ).fetchone()
+        return row is not None
+
+    def resolve(self, user_id: str, plan_id: str | None = None) -> RoutinePaths:
+        """Return the files of ``plan_id`` (the active plan when omitted)."""
+        if plan_id is None:
+            plan_id = self.active_plan(user_id)
+            if plan_id is None:
+                raise ValueError(f"User {user_id!r} has no active plan")
+        elif not self._has_plan(user_id, plan_id):
+            raise ValueError(f"No plan {plan_id!r} for user {user_id!r}")
+        return self._paths(user_id, plan_id)
+
+    def plans(self, user_id: str) -> List[str]:
+        return [
+            row[0]
+            for row in self._db.execute(
+                "SELECT plan_id FROM plans WHERE user_id = ? ORDER BY plan_id",
+                (user_id,),
+            )
+        ]
+
+    def users(self) -> List[str]:
+        return [
+            row[0]
+            for row in self._db.execute("SELECT user_id FROM users ORDER BY user_id")
+        ]
+
 
+def _read_data_file(path: Path) -> bytes:
+    """Read a plan/log file, decompressing by extension (.gz, .bz2, .xz, .zst)."""
+    payload = Path(path).read_bytes()
+    suffix = Path(path).suffix
+    # Corrupt or truncated data surfaces as OSError, which every caller catches.
     try:
-        with open(path, "r", encoding="utf-8") as log_file:
-            raw = json.load(log_file)
-    except OSError as exc:  # pragma: no cover - defensive guard
-        raise SystemExit(f"Failed to read log file: {exc}") from exc
-    except json.JSONDecodeError as exc:  # pragma: no cover - defensive guard
+        if suffix == ".gz":
+            return gzip.decompress(payload)
+        if suffix == ".bz2":
+            return bz2.decompress(payload)
+        if suffix == ".xz":
+            return lzma.decompress(payload)
+    except (zlib.error, lzma.LZMAError, EOFError) as exc:
+        raise OSError(f"{path}: {exc}") from exc
+    if suffix == ".zst":
+        module = _zstandard_module()
+        try:
+            return module.ZstdDecompressor().decompress(payload)
+        except module.ZstdError as exc:
+            raise OSError(f"{path}: {exc}") from exc
+    return payload
+
+
+def _write_data_file(path: Path, payload: bytes) -> None:
+    """Write a plan/log file, compressing by extension (.gz, .bz2, .xz, .zst)."""
+    suffix = Path(path).suffix
+    if suffix == ".gz":
+        payload = gzip.compress(payload, mtime=0)
+    elif suffix == ".bz2":
+        payload = bz2.compress(payload)
+    elif suffix == ".xz":
+        payload = lzma.compress(payload)
+    elif suffix == ".zst":
+        payload = _zstandard_module().ZstdCompressor().compress(payload)
+    Path(path).write_bytes(payload)
+
+
+def _zstandard_module() -> types.ModuleType:
+    if zstandard is None:
+        raise SystemExit("Install the zstandard package to use .zst files")
+    return zstandard
+
+
+def _json_loads(payload: bytes) -> object:
+    if orjson is not None:
+        return orjson.loads(payload)
+    if msgspec is not None:
+        return msgspec.json.decode(payload)
+    return json.loads(payload)
+
+
+def _json_dumps(data: object, compact: bool = False) -> bytes:
+    """Serialize ``data``; ``compact`` drops indentation for machine-only files."""
+    if orjson is not None:
+        options = 0 if compact else orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=options) + b"\n"
+    if msgspec is not None:
+        encoded = msgspec.json.encode(data)
+        if not compact:
+            encoded = msgspec.json.format(encoded, indent=2)
+        return encoded + b"\n"
+    if compact:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8") + b"\n"
+    return json.dumps(data, indent=2).encode("utf-8") + b"\n"
+
+
+def _decode_practice_log(
+    payload: bytes, path: Path
+) -> tuple[
+    List[PracticeLogEntry], List[tuple[int, datetime.datetime | None]], int | None
+]:
+    if msgspec is not None:
+        # Typed decoding builds entries and datetimes in one pass. It is lax
+        # about numeric strings like the fallback below, and anything it still
+        # rejects goes to the fallback so validity never depends on msgspec.
+        try:
+            typed = msgspec.json.decode(payload, type=_PracticeLogFile, strict=False)
+        except msgspec.ValidationError:
+            typed = None
+        except msgspec.DecodeError as exc:  # pragma: no cover - defensive guard
+            raise SystemExit(f"Invalid log JSON: {exc}") from exc
+        if typed is not None:
+            return (
+                typed.get("entries", []),
+                [
+                    (value, None)
+                    if isinstance(value, int)
+                    else (value["session_index"], value.get("completed_at"))
+                    for value in typed.get("done_sessions", [])
+                ],
+                typed.get("next_id"),
+            )
+
+    try:
+        raw = _json_loads(payload)
+    except ValueError as exc:  # pragma: no cover - defensive guard
         raise SystemExit(f"Invalid log JSON: {exc}") from exc
 
     entries: List[PracticeLogEntry] = []
@@ -213,21 +703,195 @@ def _load_practice_log(path: Path, session_count: int) -> PracticeLog:
                 f"Malformed done_sessions value in {path}: {exc}"
             ) from exc
 
-    next_id = raw.get("next_id", (max((e["entry_id"] for e in entries), default=0) + 1))
-    return PracticeLog(session_count, entries, int(next_id), done_sessions)
+    next_id = raw.get("next_id")
+    return entries, done_sessions, None if next_id is None else int(next_id)
+
+
+def _load_practice_log(path: Path, session_count: int) -> PracticeLog:
+    path = Path(path)
+    if not path.exists():
+        return PracticeLog(session_count)
+
+    try:
+        payload = _read_data_file(path)
+    except (OSError, EOFError, lzma.LZMAError) as exc:
+        raise SystemExit(f"Failed to read log file: {exc}") from exc
+
+    entries, done_sessions, next_id = _decode_practice_log(payload, path)
+    if next_id is None:
+        next_id = max((e["entry_id"] for e in entries), default=0) + 1
+    return PracticeLog(session_count, entries, next_id, done_sessions)
 
 
-def _save_practice_log(path: Path, log: PracticeLog) -> None:
+def _save_practice_log(path: Path, log: PracticeLog, compact: bool = False) -> None:
     path = Path(path)
     data = log.to_json()
     try:
-        with open(path, "w", encoding="utf-8") as log_file:
-            json.dump(data, log_file, indent=2)
-            log_file.write("\n")
+        _write_data_file(path, _json_dumps(data, compact))
     except OSError as exc:  # pragma: no cover - defensive guard
         raise SystemExit(f"Failed to write log file: {exc}") from exc
 
 
+class ArchiveSegment(TypedDict):
+    """Manifest record for one immutable archive segment of a practice log."""
+
+    file: str
+    session_count: int
+    session_range: List[int]
+    time_span: List[str] | None
+    entry_count: int
+    done_count: int
+    archived_at: str
+    generated_on: str | None
+    config_hash: str | None
+
+
+def _archive_dir(log_path: Path) -> Path:
+    """Archive directory next to a log: ``x.practice_log.archive`` for any suffix."""
+    stem = Path(log_path).name.split(".json")[0]
+    return Path(log_path).with_name(f"{stem}.archive")
+
+
+def _load_archive_manifest(archive_dir: Path) -> List[ArchiveSegment]:
+    manifest_path = archive_dir / "manifest.json"
+    if not manifest_path.exists():
+        return []
+    try:
+        segments = _json_loads(manifest_path.read_bytes())
+    except OSError as exc:
+        raise SystemExit(f"Failed to read archive manifest: {exc}") from exc
+    except ValueError as exc:
+        raise SystemExit(f"Invalid archive manifest: {exc}") from exc
+    if not isinstance(segments, list):
+        raise SystemExit("Archive manifest must be a list of segments.")
+    return segments
+
+
+def _archive_practice_log(
+    log_path: Path, log: PracticeLog, plan_data: Mapping[str, object] | None = None
+) -> ArchiveSegment:
+    """Move everything in ``log`` into a new compressed archive segment.
+
+    The segment is written once, made read-only and recorded in the manifest
+    with its session range and time span, so history queries can skip it
+    without opening it. The caller then starts a fresh hot log; entry ids keep
+    counting from ``log.next_id`` so they stay unique across segments.
+    """
+    entries = log.all_entries()
+    done = log.done_sessions()
+    if not entries and not done:
+        raise SystemExit("The practice log is empty; nothing to archive.")
+
+    archive_dir = _archive_dir(log_path)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    segments = _load_archive_manifest(archive_dir)
+    segment_path = archive_dir / f"segment-{len(segments) + 1:04d}.json.xz"
+    if segment_path.exists():
+        raise SystemExit(f"Archive segment {segment_path} already exists.")
+    _write_data_file(segment_path, _json_dumps(log.to_json(), compact=True))
+    segment_path.chmod(0o444)
+
+    sessions = [entry["session_index"] for entry in entries] + list(done)
+    times = [entry["logged_at"] for entry in entries] + [
+        completed_at for completed_at in done.values() if completed_at is not None
+    ]
+    segment: ArchiveSegment = {
+        "file": segment_path.name,
+        "session_count": log.session_count,
+        "session_range": [min(sessions), max(sessions)],
+        "time_span": (
+            [min(times).isoformat(), max(times).isoformat()] if times else None
+        ),
+        "entry_count": len(entries),
+        "done_count": len(done),
+        "archived_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "generated_on": None,
+        "config_hash": None,
+    }
+    if plan_data:
+        generated_on = plan_data.get("generated_on")
+        config_hash = plan_data.get("config_hash")
+        if isinstance(generated_on, str):
+            segment["generated_on"] = generated_on
+        if isinstance(config_hash, str):
+            segment["config_hash"] = config_hash
+
+    manifest_path = archive_dir / "manifest.json"
+    staging_path = manifest_path.with_suffix(".json.tmp")
+    staging_path.write_bytes(_json_dumps(segments + [segment]))
+    staging_path.replace(manifest_path)
+    return segment
+
+
+def _default_sync_state_path(config_path: str) -> Path:
+    return Path(config_path).with_suffix(".sync.json")
+
+
+def _forget_synced_entries(state_path: Path, entry_ids: Set[int]) -> None:
+    """Drop archived entries from a sync state so sync does not see them as deleted.
+
+    The remote copies stay where they are; sync simply stops tracking them.
+    """
+    if not state_path.exists() or not entry_ids:
+        return
+    try:
+        states = _json_loads(state_path.read_bytes())
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"Failed to read sync state: {exc}") from exc
+    if not isinstance(states, dict):
+        raise SystemExit("Sync state must be an object.")
+    for state in states.values():
+        entries = state.get("entries", {}) if isinstance(state, dict) else {}
+        for entry_id in [key for key in entries if int(key) in entry_ids]:
+            del entries[entry_id]
+    state_path.write_bytes(_json_dumps(states))
+
+
+def _archived_entries(
+    log_path: Path,
+    start: datetime.datetime | None = None,
+    end: datetime.datetime | None = None,
+    session_index: int | None = None,
+) -> tuple[List[tuple[ArchiveSegment, PracticeLog]], int]:
+    """Open the archive segments that can hold matches; also return how many exist.
+
+    Segments whose time span misses [start, end) or whose session range misses
+    ``session_index`` are skipped from the manifest alone.
+    """
+    archive_dir = _archive_dir(log_path)
+    segments = _load_archive_manifest(archive_dir)
+    opened: List[tuple[ArchiveSegment, PracticeLog]] = []
+    for segment in segments:
+        low, high = segment["session_range"]
+        if session_index is not None and not low <= session_index <= high:
+            continue
+        span = segment["time_span"]
+        if (start is not None or end is not None) and span is None:
+            continue
+        if span is not None:
+            first = _naive_local(datetime.datetime.fromisoformat(span[0]))
+            last = _naive_local(datetime.datetime.fromisoformat(span[1]))
+            if start is not None and last < start:
+                continue
+            if end is not None and first >= end:
+                continue
+        segment_path = archive_dir / segment["file"]
+        try:
+            payload = _read_data_file(segment_path)
+        except (OSError, EOFError, lzma.LZMAError) as exc:
+            raise SystemExit(f"Failed to read archive segment: {exc}") from exc
+        entries, done_sessions, next_id = _decode_practice_log(payload, segment_path)
+        opened.append(
+            (
+                segment,
+                PracticeLog(
+                    segment["session_count"], entries, next_id or 1, done_sessions
+                ),
+            )
+        )
+    return opened, len(segments)
+
+
 def _config_hash(config_path: str) -> str:
     try:
         content = Path(config_path).read_bytes()
@@ -242,22 +906,114 @@ def _write_plan_json(
     picks: Dict[str, int],
     generated_on: str,
     config_path: str,
+    compact: bool = False,
+    stream_seed: int | None = None,
 ) -> None:
-    data = {
+    data: Dict[str, object] = {
         "generated_on": generated_on,
         "session_count": len(plan),
         "plan": plan,
         "picks": picks,
         "config_hash": _config_hash(config_path),
     }
+    if stream_seed is not None:
+        # Recorded so any session can be regenerated from its own stream.
+        data["rng"] = "session"
+        data["seed"] = stream_seed
     try:
-        with open(path, "w", encoding="utf-8") as plan_file:
-            json.dump(data, plan_file, indent=2)
-            plan_file.write("\n")
+        _write_data_file(path, _json_dumps(data, compact))
     except OSError as exc:  # pragma: no cover - defensive guard
         raise SystemExit(f"Failed to write plan JSON: {exc}") from exc
 
 
+class PlanCursor(TypedDict):
+    """Where a rolling plan stands: enough to draw the next session, no history."""
+
+    seed: int
+    next_session: int
+    days_since: Dict[str, int]
+
+
+def _default_cursor_path(config_path: str) -> Path:
+    return Path(config_path).with_suffix(".cursor.json")
+
+
+def _load_cursor(path: Path, seed: int | None) -> PlanCursor:
+    """Load a saved cursor, or start a fresh one (seeded randomly without ``seed``)."""
+    if not path.exists():
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**63)
+        return {"seed": seed, "next_session": 0, "days_since": {}}
+    try:
+        data = _json_loads(_read_data_file(path))
+    except (OSError, EOFError, lzma.LZMAError) as exc:
+        raise SystemExit(f"Failed to read cursor: {exc}") from exc
+    except ValueError as exc:
+        raise SystemExit(f"Invalid cursor JSON: {exc}") from exc
+    if (
+        not isinstance(data, dict)
+        or not isinstance(data.get("seed"), int)
+        or not isinstance(data.get("next_session"), int)
+        or not isinstance(data.get("days_since"), dict)
+    ):
+        raise SystemExit("Cursor must have integer seed/next_session and days_since")
+    return {
+        "seed": data["seed"],
+        "next_session": data["next_session"],
+        "days_since": {
+            str(option): int(gap) for option, gap in data["days_since"].items()
+        },
+    }
+
+
+def _save_cursor(path: Path, cursor: PlanCursor) -> None:
+    try:
+        _write_data_file(path, _json_dumps(cursor))
+    except OSError as exc:  # pragma: no cover - defensive guard
+        raise SystemExit(f"Failed to write cursor: {exc}") from exc
+
+
+def _read_plan_json(
+    plan_path: Path, config_path: str, session_count: int, action: str
+) -> Dict[str, object]:
+    """Load plan JSON and check it still matches the config it was generated from."""
+    try:
+        plan_data = _json_loads(_read_data_file(plan_path))
+    except (OSError, EOFError, lzma.LZMAError) as exc:
+        raise SystemExit(f"Failed to read plan JSON: {exc}") from exc
+    except ValueError as exc:  # pragma: no cover - defensive guard
+        raise SystemExit(f"Invalid plan JSON: {exc}") from exc
+    if not isinstance(plan_data, dict):
+        raise SystemExit("Plan JSON must be an object.")
+
+    plan_sessions = int(plan_data.get("session_count", 0))
+    if plan_sessions != session_count:
+        raise SystemExit(
+            f"Plan session count {plan_sessions} does not match config sessions "
+            f"{session_count}. Regenerate the plan before {action}."
+        )
+    config_hash = plan_data.get("config_hash")
+    if config_hash and config_hash != _config_hash(config_path):
+        raise SystemExit(
+            "Configuration has changed since the plan was generated. "
+            f"Regenerate the plan before {action}."
+        )
+    return plan_data
+
+
+def _parse_time_bound(value: str, end_of_day: bool = False) -> datetime.datetime:
+    """Parse an ISO date or datetime; bare dates may round up to the next midnight."""
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(
+            f"expected an ISO date or datetime, got {value!r}"
+        ) from exc
+    if end_of_day and len(value) == len("YYYY-MM-DD"):
+        parsed += datetime.timedelta(days=1)
+    return _naive_local(parsed)
+
+
 def _normalize_session_index(session_number: int, session_count: int) -> int:
     session_index = session_number - 1
     if session_index < 0 or session_index >= session_count:
@@ -302,77 +1058,395 @@ def _load_config(path: str) -> Config:
     if data["max_gap"] < 0 or data["sessions"] <= 0:
         raise SystemExit("max_gap must be >= 0 and sessions must be > 0")
 
+    weights = data.get("weights", {})
+    if not isinstance(weights, dict) or not all(
+        isinstance(weight, (int, float)) and weight > 0 for weight in weights.values()
+    ):
+        raise SystemExit("Config key 'weights' must map options to positive numbers")
+    unknown = sorted(set(weights) - set(options))
+    if unknown:
+        raise SystemExit(f"Weights given for unknown options: {', '.join(unknown)}")
+
+    if data.get("rng", "shared") not in _RNG_SCHEMES:
+        raise SystemExit(
+            f"Config key 'rng' must be one of: {', '.join(sorted(_RNG_SCHEMES))}"
+        )
+
     return data
 
 
-def _build_plan(
-    options: Sequence[str],
+def _intern_options(options: Sequence[str]) -> tuple[List[str], List[int]]:
+    """Return (distinct option names, id of each ``options`` entry).
+
+    Repeated names share one id, so the planner works on small integers and
+    only maps back to strings when the plan is returned.
+    """
+    ids: Dict[str, int] = {}
+    catalog = [ids.setdefault(option, len(ids)) for option in options]
+    return list(ids), catalog
+
+
+class SessionStreams:
+    """Independent RNG stream per session, derived from (seed, session index).
+
+    Unlike one shared ``random.Random``, session ``i`` draws the same numbers no
+    matter how many sessions were generated before it, so a plan can be
+    regenerated from any session (given the planner state there) or split into
+    batches and still match the serial result.
+    """
+
+    def __init__(self, seed: int):
+        self.seed = seed
+
+    def for_session(self, session_index: int) -> random.Random:
+        # String seeds are hashed with SHA-512, so streams are stable across
+        # processes and Python builds.
+        return random.Random(f"routinely:{self.seed}:{session_index}")
+
+
+def _plan_sessions(
+    catalog: Sequence[int],
+    sort_keys: Sequence[str],
     items_per_session: int,
     max_gap: int,
-    sessions: int,
-    rng: random.Random,
-) -> tuple[List[List[str]], Dict[str, int]]:
-    plan: List[List[str]] = []
-    picks = {opt: 0 for opt in options}
-    days_since = {opt: 0 for opt in options}
-
-    for _ in range(sessions):
-        urgent = [opt for opt, gap in days_since.items() if gap >= max_gap]
+    days_since: List[int],
+    picks: List[int],
+    rng: random.Random | SessionStreams,
+    first_session: int = 0,
+) -> Iterator[List[int]]:
+    """Yield the option ids of each session from ``first_session`` on, forever.
+
+    ``days_since`` and ``picks`` are indexed by option id and updated in place,
+    so they always describe the state after the last yielded session.
+    """
+    is_urgent = bytearray(len(days_since))
+    is_selected = bytearray(len(days_since))
+    session_index = first_session
+
+    while True:
+        session_rng = (
+            rng.for_session(session_index) if isinstance(rng, SessionStreams) else rng
+        )
+        urgent = [
+            option_id for option_id, gap in enumerate(days_since) if gap >= max_gap
+        ]
         if len(urgent) > items_per_session:
             raise SystemExit(
                 "Cannot satisfy max_gap constraint with the current settings"
             )
 
-        chosen: List[str] = urgent[:]
+        chosen: List[int] = urgent[:]
         remaining_slots = items_per_session - len(chosen)
         if remaining_slots:
-            remaining = [opt for opt in options if opt not in urgent]
-            rng.shuffle(remaining)
-            remaining.sort(key=lambda option: days_since[option], reverse=True)
+            for option_id in urgent:
+                is_urgent[option_id] = 1
+            remaining = [option_id for option_id in catalog if not is_urgent[option_id]]
+            for option_id in urgent:
+                is_urgent[option_id] = 0
+            session_rng.shuffle(remaining)
+            remaining.sort(key=days_since.__getitem__, reverse=True)
             chosen.extend(remaining[:remaining_slots])
 
-        ordered = sorted(chosen, key=lambda option: option[:1].lower())
-        plan.append(ordered)
+        chosen.sort(key=sort_keys.__getitem__)
 
-        selected = set(chosen)
-        for opt in options:
-            if opt in selected:
-                picks[opt] += 1
-                days_since[opt] = 0
+        for option_id in chosen:
+            is_selected[option_id] = 1
+        for option_id in catalog:
+            if is_selected[option_id]:
+                picks[option_id] += 1
+                days_since[option_id] = 0
             else:
-                days_since[opt] += 1
+                days_since[option_id] += 1
+        for option_id in chosen:
+            is_selected[option_id] = 0
+
+        yield chosen
+        session_index += 1
+
+
+class _FenwickTree:
+    """Prefix sums over non-negative integer weights with O(log n) updates."""
+
+    def __init__(self, weights: Sequence[int]):
+        self._size = len(weights)
+        self._tree = [0] * (self._size + 1)
+        for index, weight in enumerate(weights, start=1):
+            self._tree[index] += weight
+            parent = index + (index & -index)
+            if parent <= self._size:
+                self._tree[parent] += self._tree[index]
+        self._top = 1 << (self._size.bit_length() - 1) if self._size else 0
+        self.total = sum(weights)
+
+    def add(self, index: int, delta: int) -> None:
+        self.total += delta
+        index += 1
+        while index <= self._size:
+            self._tree[index] += delta
+            index += index & -index
+
+    def find(self, target: int) -> int:
+        """Return the index whose cumulative weight range contains ``target``."""
+        position = 0
+        step = self._top
+        while step:
+            candidate = position + step
+            if candidate <= self._size and self._tree[candidate] <= target:
+                position = candidate
+                target -= self._tree[candidate]
+            step >>= 1
+        return position
+
+
+def _plan_weighted_sessions(
+    weights: Sequence[int],
+    sort_keys: Sequence[str],
+    items_per_session: int,
+    max_gap: int,
+    days_since: Sequence[int],
+    picks: List[int],
+    rng: random.Random | SessionStreams,
+    first_session: int = 0,
+) -> Iterator[List[int]]:
+    """Weighted counterpart of _plan_sessions, sub-linear in the option count.
+
+    Options sit in a heap keyed by the session in which they become urgent, so
+    finding urgent options does not scan the catalog. Each session takes the
+    urgent options, then the earliest-due ones up to ``ceil(options /
+    (max_gap + 1))`` (the rate at which options fall due, which keeps max_gap
+    satisfiable), and draws the remaining slots by weight without replacement
+    from a Fenwick tree. Only ``picks`` is updated in place; ``days_since`` is
+    just the starting state.
+    """
+    tree = _FenwickTree(weights)
+    reserved = -(-len(weights) // (max_gap + 1))
+    due_at = [first_session + max(0, max_gap - gap) for gap in days_since]
+    # (due session, option id) with lazy deletion: options picked before they
+    # fall due leave stale entries that are skipped when they reach the top.
+    due = [(session, option_id) for option_id, session in enumerate(due_at)]
+    heapq.heapify(due)
+    session_index = first_session
+
+    while True:
+        session_rng = (
+            rng.for_session(session_index) if isinstance(rng, SessionStreams) else rng
+        )
+        # Urgent options first, then enough earliest-due ones to keep pace with
+        # the rate at which options fall due; weights only decide the slack.
+        chosen: List[int] = []
+        while due and (due[0][0] <= session_index or len(chosen) < reserved):
+            due_session, option_id = heapq.heappop(due)
+            if due_at[option_id] != due_session:
+                continue
+            chosen.append(option_id)
+        if len(chosen) > items_per_session:
+            raise SystemExit(
+                "Cannot satisfy max_gap constraint with the current settings"
+            )
 
-    return plan, picks
+        for option_id in chosen:
+            tree.add(option_id, -weights[option_id])
+        while len(chosen) < items_per_session:
+            option_id = tree.find(session_rng.randrange(tree.total))
+            tree.add(option_id, -weights[option_id])
+            chosen.append(option_id)
 
+        for option_id in chosen:
+            tree.add(option_id, weights[option_id])
+            picks[option_id] += 1
+            due_at[option_id] = session_index + 1 + max_gap
+            heapq.heappush(due, (due_at[option_id], option_id))
 
-def _format_markdown(
+        chosen.sort(key=sort_keys.__getitem__)
+        yield chosen
+        session_index += 1
+
+
+def _gaps_after(
+    options: Sequence[str],
+    plan: Sequence[Sequence[str]],
+    days_since: Mapping[str, int] | None = None,
+) -> Dict[str, int]:
+    """Return the planner's days-since state after ``plan`` was practiced.
+
+    ``days_since`` is the state ``plan`` itself started from (default fresh).
+    """
+    gaps = {
+        option: len(plan) + (days_since.get(option, 0) if days_since else 0)
+        for option in options
+    }
+    for index, session in enumerate(plan):
+        for option in session:
+            if option in gaps:
+                gaps[option] = len(plan) - 1 - index
+    return gaps
+
+
+def _quantize_weights(names: Sequence[str], weights: Mapping[str, float]) -> List[int]:
+    # Integer weights keep the Fenwick sums exact; 1/1000 resolution is plenty.
+    return [max(1, round(weights.get(name, 1) * 1000)) for name in names]
+
+
+def _session_id_stream(
+    options: Sequence[str],
+    items_per_session: int,
+    max_gap: int,
+    rng: random.Random | SessionStreams,
+    first_session: int,
+    days_since: Mapping[str, int] | None,
+    weights: Mapping[str, float] | None,
+) -> tuple[List[str], List[int], Iterator[List[int]]]:
+    """Return (option names, live pick counts, endless stream of id sessions)."""
+    names, catalog = _intern_options(options)
+    gaps = [days_since.get(name, 0) if days_since else 0 for name in names]
+    picks = [0] * len(names)
+    sort_keys = [name[:1].lower() for name in names]
+    sessions_iter: Iterator[List[int]]
+    if weights:
+        sessions_iter = _plan_weighted_sessions(
+            _quantize_weights(names, weights),
+            sort_keys,
+            items_per_session,
+            max_gap,
+            gaps,
+            picks,
+            rng,
+            first_session,
+        )
+    else:
+        sessions_iter = _plan_sessions(
+            catalog,
+            sort_keys,
+            items_per_session,
+            max_gap,
+            gaps,
+            picks,
+            rng,
+            first_session,
+        )
+    return names, picks, sessions_iter
+
+
+def _build_plan(
+    options: Sequence[str],
+    items_per_session: int,
+    max_gap: int,
+    sessions: int,
+    rng: random.Random | SessionStreams,
+    first_session: int = 0,
+    days_since: Mapping[str, int] | None = None,
+    weights: Mapping[str, float] | None = None,
+) -> tuple[List[List[str]], Dict[str, int]]:
+    """Plan ``sessions`` sessions starting at index ``first_session``.
+
+    ``days_since`` resumes from an earlier planner state (sessions since each
+    option was last chosen); by default every option starts fresh. With
+    ``weights`` (default 1 per option) non-urgent options are drawn in
+    proportion to their weight instead of by how long they have waited.
+    """
+    names, picks, sessions_iter = _session_id_stream(
+        options,
+        items_per_session,
+        max_gap,
+        rng,
+        first_session,
+        days_since,
+        weights,
+    )
+    plan_ids = [next(sessions_iter) for _ in range(sessions)]
+
+    plan = [[names[option_id] for option_id in session] for session in plan_ids]
+    return plan, dict(zip(names, picks))
+
+
+def _iter_sessions(
+    options: Sequence[str],
+    items_per_session: int,
+    max_gap: int,
+    rng: random.Random | SessionStreams,
+    first_session: int = 0,
+    days_since: Mapping[str, int] | None = None,
+    weights: Mapping[str, float] | None = None,
+) -> Iterator[List[str]]:
+    """Yield planned sessions on demand, without end and without keeping history.
+
+    Takes the same arguments as _build_plan minus ``sessions``; the planner
+    state is O(options), so cost depends only on how many sessions are drawn.
+    """
+    names, _, sessions_iter = _session_id_stream(
+        options,
+        items_per_session,
+        max_gap,
+        rng,
+        first_session,
+        days_since,
+        weights,
+    )
+    for session in sessions_iter:
+        yield [names[option_id] for option_id in session]
+
+
+class RenderRow(TypedDict):
+    number: str
+    date: str
+    items: List[str]
+    done: bool
+
+
+class RenderTable(TypedDict):
+    """Session/completion table shared by every output format of one render."""
+
+    generated_on: str
+    item_headers: List[str]
+    rows: List[RenderRow]
+    counts: List[tuple[str, int]]
+
+
+def _build_render_table(
     plan: Sequence[Sequence[str]],
     picks: Dict[str, int],
     generated_on: str,
     done_marks: Mapping[int, datetime.datetime | None] | None = None,
-) -> str:
+) -> RenderTable:
     max_items = max(4, *(len(session) for session in plan)) if plan else 4
-    item_headers = [f"Item {idx}" for idx in range(1, max_items + 1)]
+    rows: List[RenderRow] = []
+    for index, session in enumerate(plan, start=1):
+        completion = done_marks.get(index - 1) if done_marks else None
+        rows.append(
+            {
+                "number": f"{index:02d}",
+                "date": completion.date().isoformat() if completion else "",
+                "items": list(session) + ["" for _ in range(max_items - len(session))],
+                "done": bool(completion),
+            }
+        )
+    return {
+        "generated_on": generated_on,
+        "item_headers": [f"Item {idx}" for idx in range(1, max_items + 1)],
+        "rows": rows,
+        "counts": sorted(picks.items()),
+    }
+
+
+def _table_to_markdown(table: RenderTable) -> str:
+    item_headers = table["item_headers"]
     header = "| Session | Date | " + " | ".join(item_headers) + " | Done |"
     separator = "| --- | --- | " + " | ".join(["---"] * len(item_headers)) + " | --- |"
 
     lines = [
         "# Practice Routine",
         "",
-        f"Generated on {generated_on}",
+        f"Generated on {table['generated_on']}",
         "",
         "## Sessions",
         header,
         separator,
     ]
-    for index, session in enumerate(plan, start=1):
-        padded = list(session) + ["" for _ in range(max_items - len(session))]
-        completion = done_marks.get(index - 1) if done_marks else None
-        date_cell = completion.date().isoformat() if completion else ""
-        done_cell = "**X**" if completion else ""
+    for row in table["rows"]:
+        done_cell = "**X**" if row["done"] else ""
         lines.append(
-            f"| {index:02d} | {date_cell} | "
-            + " | ".join(padded)
+            f"| {row['number']} | {row['date']} | "
+            + " | ".join(row["items"])
             + f" | {done_cell} |"
         )
 
@@ -385,58 +1459,636 @@ def _format_markdown(
             "| --- | --- |",
         ]
     )
-    for option, count in sorted(picks.items()):
+    for option, count in table["counts"]:
         lines.append(f"| {option} | {count} |")
 
     return "\n".join(lines) + "\n"
 
 
-def _handle_generate(args: argparse.Namespace) -> int:
-    config = _load_config(args.config)
-    rng = random.Random(config.get("seed", args.seed))
-    generated_on = datetime.date.today().strftime("%B %d %Y")
+def _table_to_html(table: RenderTable) -> str:
+    def cells(tag: str, values: Sequence[str]) -> str:
+        return "".join(f"<{tag}>{html.escape(value)}</{tag}>" for value in values)
 
-    plan, picks = _build_plan(
-        config["options"],
-        config["items_per_session"],
-        config["max_gap"],
-        config["sessions"],
-        rng,
+    headers = ["Session", "Date", *table["item_headers"], "Done"]
+    lines = [
+        "<!DOCTYPE html>",
+        "<html>",
+        "<head>",
+        '<meta charset="utf-8">',
+        "<title>Practice Routine</title>",
+        "<style>",
+        "table { border-collapse: collapse; margin-bottom: 1.5em; }",
+        "th, td { border: 1px solid #999; padding: 0.25em 0.5em; }",
+        "@page { size: landscape; margin: 1cm; }",
+        "@media print { body { font-size: 9pt; } tr { break-inside: avoid; } }",
+        "</style>",
+        "</head>",
+        "<body>",
+        "<h1>Practice Routine</h1>",
+        f"<p>Generated on {html.escape(table['generated_on'])}</p>",
+        "<h2>Sessions</h2>",
+        "<table>",
+        f"<tr>{cells('th', headers)}</tr>",
+    ]
+    for row in table["rows"]:
+        done_cell = "X" if row["done"] else ""
+        values = [row["number"], row["date"], *row["items"], done_cell]
+        lines.append(f"<tr>{cells('td', values)}</tr>")
+    lines.extend(
+        [
+            "</table>",
+            "<h2>Selection Counts</h2>",
+            "<table>",
+            f"<tr>{cells('th', ['Option', 'Count'])}</tr>",
+        ]
     )
+    for option, count in table["counts"]:
+        lines.append(f"<tr>{cells('td', [option, str(count)])}</tr>")
+    lines.extend(["</table>", "</body>", "</html>"])
+    return "\n".join(lines) + "\n"
 
-    print(f"Generated on: {generated_on}")
-    print("Practice Plan:")
-    for index, session in enumerate(plan, start=1):
-        print(f"Session {index:02d}:")
-        for item in session:
-            print(f"  - {item}")
 
-    print("\nSelection Counts:")
-    for option, count in sorted(picks.items()):
-        print(f"{option}: {count}")
+def _table_to_csv(table: RenderTable) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["Session", "Date", *table["item_headers"], "Done"])
+    for row in table["rows"]:
+        writer.writerow(
+            [row["number"], row["date"], *row["items"], "X" if row["done"] else ""]
+        )
+    return buffer.getvalue()
 
-    if args.markdown:
-        try:
-            with open(args.markdown, "w", encoding="utf-8") as markdown_file:
-                markdown_file.write(
-                    _format_markdown(plan, picks, generated_on, done_marks=None)
-                )
-        except OSError as exc:
-            raise SystemExit(f"Failed to write Markdown output: {exc}") from exc
 
-    plan_json_path: Path | None = None
-    if args.plan_json:
-        plan_json_path = Path(args.plan_json)
+def _table_to_text(table: RenderTable) -> str:
+    """Fixed-width layout that prints cleanly without further conversion."""
+    headers = ["Session", "Date", *table["item_headers"], "Done"]
+    body = [
+        [row["number"], row["date"], *row["items"], "X" if row["done"] else ""]
+        for row in table["rows"]
+    ]
+    widths = [
+        max(len(line[column]) for line in [headers, *body])
+        for column in range(len(headers))
+    ]
+
+    def format_line(values: Sequence[str]) -> str:
+        return "  ".join(
+            value.ljust(width) for value, width in zip(values, widths)
+        ).rstrip()
+
+    lines = [
+        "PRACTICE ROUTINE",
+        f"Generated on {table['generated_on']}",
+        "",
+        format_line(headers),
+        format_line(["-" * width for width in widths]),
+        *(format_line(values) for values in body),
+        "",
+        "Selection Counts",
+    ]
+    option_width = max((len(option) for option, _ in table["counts"]), default=0)
+    for option, count in table["counts"]:
+        lines.append(f"{option.ljust(option_width)}  {count}")
+    return "\n".join(lines) + "\n"
+
+
+_RENDERERS = {
+    "markdown": _table_to_markdown,
+    "html": _table_to_html,
+    "csv": _table_to_csv,
+    "text": _table_to_text,
+}
+
+
+def _format_markdown(
+    plan: Sequence[Sequence[str]],
+    picks: Dict[str, int],
+    generated_on: str,
+    done_marks: Mapping[int, datetime.datetime | None] | None = None,
+) -> str:
+    return _table_to_markdown(
+        _build_render_table(plan, picks, generated_on, done_marks)
+    )
+
+
+def _derive_seed(base_seed: int | None, config_path: str) -> int:
+    """Return a stable per-config seed from an optional base seed and the config."""
+    material = f"{base_seed}:{_config_hash(config_path)}".encode("utf-8")
+    return int.from_bytes(hashlib.sha256(material).digest()[:8], "big")
+
+
+def _expand_config_paths(paths: Sequence[str]) -> List[str]:
+    expanded: List[str] = []
+    for raw_path in paths:
+        path = Path(raw_path)
+        if not path.is_dir():
+            expanded.append(raw_path)
+            continue
+        for candidate in sorted(path.glob("*.json")):
+            if candidate.name.endswith(_SIDECAR_SUFFIXES):
+                continue
+            expanded.append(str(candidate))
+    return expanded
+
+
+def _generate_to_files(
+    config_path: str,
+    seed: int | None,
+    markdown_path: Path | None,
+    plan_json_path: Path | None,
+    generated_on: str,
+    compact: bool = False,
+) -> tuple[List[List[str]], Dict[str, int]]:
+    config = _load_config(config_path)
+    seed = config.get("seed", seed)
+    rng: random.Random | SessionStreams
+    if config.get("rng") == "session":
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**63)
+        rng = SessionStreams(seed)
+    else:
+        rng = random.Random(seed)
+
+    plan, picks = _build_plan(
+        config["options"],
+        config["items_per_session"],
+        config["max_gap"],
+        config["sessions"],
+        rng,
+        weights=config.get("weights"),
+    )
+
+    if markdown_path:
+        try:
+            with open(markdown_path, "w", encoding="utf-8") as markdown_file:
+                markdown_file.write(
+                    _format_markdown(plan, picks, generated_on, done_marks=None)
+                )
+        except OSError as exc:
+            raise SystemExit(f"Failed to write Markdown output: {exc}") from exc
+
+    if plan_json_path:
+        _write_plan_json(
+            plan_json_path,
+            plan,
+            picks,
+            generated_on,
+            config_path,
+            compact,
+            stream_seed=seed if isinstance(rng, SessionStreams) else None,
+        )
+
+    return plan, picks
+
+
+def _generate_batch_job(
+    config_path: str,
+    base_seed: int | None,
+    markdown_dir: str | None,
+    generated_on: str,
+    compact: bool,
+) -> tuple[str, int, float, str | None]:
+    """Batch generation worker; returns (path, sessions, seconds, error)."""
+    started = time.perf_counter()
+    try:
+        markdown_path = (
+            Path(markdown_dir) / Path(config_path).with_suffix(".md").name
+            if markdown_dir
+            else None
+        )
+        plan, _ = _generate_to_files(
+            config_path,
+            _derive_seed(base_seed, config_path),
+            markdown_path,
+            _default_plan_path(config_path),
+            generated_on,
+            compact,
+        )
+    except SystemExit as exc:
+        return config_path, 0, time.perf_counter() - started, str(exc)
+    except Exception as exc:  # One bad config must not abort the whole batch.
+        error = f"{type(exc).__name__}: {exc}"
+        return config_path, 0, time.perf_counter() - started, error
+    return config_path, len(plan), time.perf_counter() - started, None
+
+
+def _handle_generate_batch(
+    args: argparse.Namespace, config_paths: Sequence[str]
+) -> int:
+    if args.markdown or args.plan_json:
+        raise SystemExit(
+            "--markdown/--plan-json only apply to a single config; "
+            "use --markdown-dir when generating several"
+        )
+    if not config_paths:
+        raise SystemExit("No config files found to generate")
+    if args.markdown_dir:
+        Path(args.markdown_dir).mkdir(parents=True, exist_ok=True)
+
+    generated_on = datetime.date.today().strftime("%B %d %Y")
+    total = len(config_paths)
+    failures = 0
+    session_total = 0
+    started = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [
+            pool.submit(
+                _generate_batch_job,
+                config_path,
+                args.seed,
+                args.markdown_dir,
+                generated_on,
+                args.compact_json,
+            )
+            for config_path in config_paths
+        ]
+        for done_count, future in enumerate(
+            concurrent.futures.as_completed(futures), start=1
+        ):
+            config_path, sessions, elapsed, error = future.result()
+            if error:
+                failures += 1
+                print(f"[{done_count}/{total}] {config_path}: FAILED ({error})")
+                continue
+            session_total += sessions
+            print(
+                f"[{done_count}/{total}] {config_path}: {sessions} sessions "
+                f"in {elapsed:.3f}s"
+            )
+
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed else float(total)
+    print(
+        f"Generated {total - failures}/{total} plans ({session_total} sessions) "
+        f"in {elapsed:.2f}s ({rate:.1f} plans/s)"
+    )
+    return 1 if failures else 0
+
+
+def _rebase_plan(
+    config: Config,
+    old_plan: Sequence[Sequence[str]],
+    keep: int,
+    rng: random.Random | SessionStreams,
+) -> tuple[List[List[str]], Dict[str, int]]:
+    """Keep the first ``keep`` sessions of ``old_plan`` and re-plan the rest."""
+    if keep > config["sessions"]:
+        raise SystemExit(
+            f"Config has {config['sessions']} sessions but {keep} are already "
+            "completed; increase sessions before rebasing."
+        )
+    kept = [list(session) for session in old_plan[:keep]]
+    max_gap = config["max_gap"]
+    planned = {option for session in old_plan for option in session}
+    days_since = {
+        option: min(gap, max_gap)
+        for option, gap in _gaps_after(config["options"], kept).items()
+        if option in planned
+    }
+    # Options new to the plan come up as early as possible, but staggered so
+    # no session has more options falling due than it has slots.
+    due_counts = [0] * (max_gap + 1)
+    for gap in days_since.values():
+        due_counts[max_gap - gap] += 1
+    for option in config["options"]:
+        if option in days_since:
+            continue
+        due = next(
+            (
+                offset
+                for offset, count in enumerate(due_counts)
+                if count < config["items_per_session"]
+            ),
+            0,
+        )
+        due_counts[due] += 1
+        days_since[option] = max_gap - due
+    replanned, picks = _build_plan(
+        config["options"],
+        config["items_per_session"],
+        config["max_gap"],
+        config["sessions"] - keep,
+        rng,
+        first_session=keep,
+        days_since=days_since,
+        weights=config.get("weights"),
+    )
+    for session in kept:
+        for option in session:
+            picks[option] = picks.get(option, 0) + 1
+    return kept + replanned, picks
+
+
+def _plan_diff(
+    old_plan: Sequence[Sequence[str]], new_plan: Sequence[Sequence[str]]
+) -> List[str]:
+    lines: List[str] = []
+    for index in range(max(len(old_plan), len(new_plan))):
+        old_row = list(old_plan[index]) if index < len(old_plan) else None
+        new_row = list(new_plan[index]) if index < len(new_plan) else None
+        if old_row == new_row:
+            continue
+        lines.append(f"Session {index + 1:02d}:")
+        if old_row is not None:
+            lines.append(f"  - {', '.join(old_row)}")
+        if new_row is not None:
+            lines.append(f"  + {', '.join(new_row)}")
+    return lines
+
+
+def _handle_generate_rebase(args: argparse.Namespace, config_path: str) -> int:
+    config = _load_config(config_path)
+    plan_path = Path(args.plan_json) if args.plan_json else _default_plan_path(
+        config_path
+    )
+    try:
+        old_data = _json_loads(_read_data_file(plan_path))
+    except (OSError, EOFError, lzma.LZMAError, ValueError) as exc:
+        raise SystemExit(f"Failed to read plan JSON to rebase: {exc}") from exc
+    old_plan = old_data.get("plan") if isinstance(old_data, dict) else None
+    if not isinstance(old_plan, list):
+        raise SystemExit("Plan JSON missing plan rows to rebase.")
+
+    log_path = Path(args.log_file) if args.log_file else _default_log_path(
+        config_path
+    )
+    log = _load_practice_log(log_path, len(old_plan))
+    done = log.done_sessions()
+    keep = max(done) + 1 if done else 0
+    logged = [entry["session_index"] for entry in log.all_entries()]
+    if logged and max(logged) >= config["sessions"]:
+        raise SystemExit(
+            f"Log has notes for session {max(logged) + 1}, beyond the "
+            f"{config['sessions']} sessions in the config."
+        )
+
+    seed = config.get("seed", args.seed)
+    rng: random.Random | SessionStreams
+    if config.get("rng") == "session":
+        if seed is None:
+            seed = old_data.get("seed")
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**63)
+        rng = SessionStreams(seed)
+    else:
+        rng = random.Random(seed)
+
+    plan, picks = _rebase_plan(config, old_plan, keep, rng)
+    generated_on = datetime.date.today().strftime("%B %d %Y")
+    _write_plan_json(
+        plan_path,
+        plan,
+        picks,
+        generated_on,
+        config_path,
+        args.compact_json,
+        stream_seed=seed if isinstance(rng, SessionStreams) else None,
+    )
+    if args.markdown:
+        try:
+            with open(args.markdown, "w", encoding="utf-8") as markdown_file:
+                markdown_file.write(
+                    _format_markdown(plan, picks, generated_on, done_marks=done)
+                )
+        except OSError as exc:
+            raise SystemExit(f"Failed to write Markdown output: {exc}") from exc
+
+    diff = _plan_diff(old_plan, plan)
+    print(
+        f"Kept {keep} sessions through the last completed one; "
+        f"re-planned {len(plan) - keep}."
+    )
+    print("\n".join(diff) if diff else "No sessions changed.")
+    print(f"Wrote plan JSON to {plan_path}")
+    return 0
+
+
+def _handle_generate(args: argparse.Namespace) -> int:
+    config_paths = _expand_config_paths(args.config)
+    if len(args.config) > 1 or Path(args.config[0]).is_dir():
+        if args.rebase:
+            raise SystemExit("--rebase only applies to a single config")
+        return _handle_generate_batch(args, config_paths)
+
+    config_path = config_paths[0]
+    if args.markdown_dir:
+        raise SystemExit("--markdown-dir only applies when generating several configs")
+    if args.rebase:
+        return _handle_generate_rebase(args, config_path)
+
+    generated_on = datetime.date.today().strftime("%B %d %Y")
+    plan_json_path: Path | None = None
+    if args.plan_json:
+        plan_json_path = Path(args.plan_json)
     elif args.markdown:
-        plan_json_path = _default_plan_path(args.config)
+        plan_json_path = _default_plan_path(config_path)
+
+    plan, picks = _generate_to_files(
+        config_path,
+        args.seed,
+        Path(args.markdown) if args.markdown else None,
+        plan_json_path,
+        generated_on,
+        args.compact_json,
+    )
+
+    print(f"Generated on: {generated_on}")
+    print("Practice Plan:")
+    for index, session in enumerate(plan, start=1):
+        print(f"Session {index:02d}:")
+        for item in session:
+            print(f"  - {item}")
+
+    print("\nSelection Counts:")
+    for option, count in sorted(picks.items()):
+        print(f"{option}: {count}")
 
     if plan_json_path:
-        _write_plan_json(plan_json_path, plan, picks, generated_on, args.config)
         print(f"Wrote plan JSON to {plan_json_path}")
 
     return 0
 
 
+def _advance_cursor(
+    config: Config, cursor: PlanCursor, count: int
+) -> tuple[List[List[str]], PlanCursor]:
+    """Draw the next ``count`` sessions of a rolling plan and the cursor after them.
+
+    Sessions use per-session RNG streams, so drawing 7 and then 7 more matches
+    drawing 14 at once. Options added to the config since the cursor was saved
+    start fresh and removed ones are dropped.
+    """
+    options = config["options"]
+    days_since = {
+        option: cursor["days_since"].get(option, 0) for option in options
+    }
+    sessions = list(
+        itertools.islice(
+            _iter_sessions(
+                options,
+                config["items_per_session"],
+                config["max_gap"],
+                SessionStreams(cursor["seed"]),
+                first_session=cursor["next_session"],
+                days_since=days_since,
+                weights=config.get("weights"),
+            ),
+            count,
+        )
+    )
+    advanced: PlanCursor = {
+        "seed": cursor["seed"],
+        "next_session": cursor["next_session"] + len(sessions),
+        "days_since": _gaps_after(options, sessions, days_since),
+    }
+    return sessions, advanced
+
+
+def _handle_next(args: argparse.Namespace) -> int:
+    if args.count <= 0:
+        raise SystemExit("--count must be > 0")
+    config = _load_config(args.config)
+    cursor_path = (
+        Path(args.cursor) if args.cursor else _default_cursor_path(args.config)
+    )
+    cursor = _load_cursor(cursor_path, config.get("seed", args.seed))
+    sessions, advanced = _advance_cursor(config, cursor, args.count)
+
+    for index, session in enumerate(sessions, start=cursor["next_session"] + 1):
+        print(f"Session {index:02d}:")
+        for item in session:
+            print(f"  - {item}")
+
+    if not args.peek:
+        _save_cursor(cursor_path, advanced)
+        print(f"Saved cursor at session {advanced['next_session']} to {cursor_path}")
+    return 0
+
+
+def _select_entries(
+    log: PracticeLog,
+    since: datetime.datetime | None,
+    until: datetime.datetime | None,
+    session_index: int | None,
+) -> List[PracticeLogEntry]:
+    if since is not None or until is not None:
+        entries = log.entries_between(since, until)
+        if session_index is not None:
+            entries = [
+                entry for entry in entries if entry["session_index"] == session_index
+            ]
+        return entries
+    if session_index is None:
+        return log.all_entries()
+    return log.entries_for(session_index)
+
+
+def _print_archived(
+    log_path: Path,
+    select: Callable[[PracticeLog], List[PracticeLogEntry]],
+    since: datetime.datetime | None = None,
+    until: datetime.datetime | None = None,
+    session_index: int | None = None,
+) -> bool:
+    """Print matches from the archive segments that may hold any; True if found."""
+    opened, total = _archived_entries(log_path, since, until, session_index)
+    found = False
+    for segment, archived in opened:
+        entries = select(archived)
+        if not entries:
+            continue
+        found = True
+        label = segment["generated_on"] or segment["archived_at"]
+        print(f"Archive {segment['file']} ({label}):")
+        _print_entries(entries)
+    print(f"(Searched {len(opened)} of {total} archive segments.)")
+    return found
+
+
+def _print_entries(entries: Sequence[PracticeLogEntry]) -> None:
+    for entry in entries:
+        timestamp = entry["logged_at"].isoformat(timespec="seconds")
+        print(
+            f"[{entry['entry_id']}] Session {entry['session_index'] + 1} "
+            f"{timestamp}: {entry['notes']}"
+        )
+
+
+def _iter_import_records(
+    path: Path, import_format: str | None
+) -> Iterator[tuple[int, object]]:
+    """Yield (row number, raw record) pairs from a CSV or JSONL import file."""
+    import_format = import_format or (
+        "csv" if path.suffix.lower() == ".csv" else "jsonl"
+    )
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as import_file:
+            if import_format == "csv":
+                # Row 1 is the header, so data rows start at 2.
+                yield from enumerate(csv.DictReader(import_file), start=2)
+                return
+            for row_number, line in enumerate(import_file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield row_number, json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield row_number, exc
+    except OSError as exc:
+        raise SystemExit(f"Failed to read import file: {exc}") from exc
+
+
+def _parse_import_record(
+    record: object, session_count: int
+) -> tuple[int, str, datetime.datetime | None]:
+    if isinstance(record, Exception):
+        raise ValueError(f"invalid JSON: {record}")
+    if not isinstance(record, dict):
+        raise ValueError("record must be an object with session and notes")
+    try:
+        session_number = int(record["session"])
+        notes = str(record["notes"] or "").strip()
+    except KeyError as exc:
+        raise ValueError(f"missing field {exc}") from exc
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"session must be an integer ({exc})") from exc
+
+    if not 1 <= session_number <= session_count:
+        raise ValueError(
+            f"session must be between 1 and {session_count}, got {session_number}"
+        )
+    if not notes:
+        raise ValueError("notes cannot be empty")
+
+    logged_raw = record.get("logged_at")
+    if not logged_raw:
+        return session_number - 1, notes, None
+    try:
+        logged_at = datetime.datetime.fromisoformat(logged_raw)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"logged_at must be an ISO datetime ({exc})") from exc
+    return session_number - 1, notes, _naive_local(logged_at)
+
+
+def _import_entries(
+    log: PracticeLog, path: Path, import_format: str | None
+) -> tuple[int, List[str]]:
+    """Add every valid record to ``log``; return the count and per-row errors."""
+    imported = 0
+    errors: List[str] = []
+    for row_number, record in _iter_import_records(path, import_format):
+        try:
+            session_index, notes, logged_at = _parse_import_record(
+                record, log.session_count
+            )
+        except ValueError as exc:
+            errors.append(f"row {row_number}: {exc}")
+            continue
+        log.add_entry(session_index, notes, logged_at)
+        imported += 1
+    return imported, errors
+
+
 def _handle_log(args: argparse.Namespace) -> int:
     config = _load_config(args.config)
     session_count = config["sessions"]
@@ -446,27 +2098,9 @@ def _handle_log(args: argparse.Namespace) -> int:
     plan_path = Path(args.plan_json) if args.plan_json else _default_plan_path(
         args.config
     )
+    plan_data = None
     if plan_path.exists():
-        try:
-            with open(plan_path, "r", encoding="utf-8") as plan_file:
-                plan_data = json.load(plan_file)
-        except OSError as exc:  # pragma: no cover - defensive guard
-            raise SystemExit(f"Failed to read plan JSON: {exc}") from exc
-        except json.JSONDecodeError as exc:  # pragma: no cover - defensive guard
-            raise SystemExit(f"Invalid plan JSON: {exc}") from exc
-
-        plan_sessions = int(plan_data.get("session_count", 0))
-        if plan_sessions != session_count:
-            raise SystemExit(
-                f"Plan session count {plan_sessions} does not match config sessions "
-                f"{session_count}. Regenerate the plan before logging."
-            )
-        config_hash = plan_data.get("config_hash")
-        if config_hash and config_hash != _config_hash(args.config):
-            raise SystemExit(
-                "Configuration has changed since the plan was generated. "
-                "Regenerate the plan before logging."
-            )
+        plan_data = _read_plan_json(plan_path, args.config, session_count, "logging")
 
     if args.log_command == "add":
         notes = args.notes.strip()
@@ -475,7 +2109,7 @@ def _handle_log(args: argparse.Namespace) -> int:
 
         session_index = _normalize_session_index(args.session, session_count)
         entry = log.add_entry(session_index, notes)
-        _save_practice_log(log_path, log)
+        _save_practice_log(log_path, log, args.compact_json)
         print(
             f"Added entry {entry['entry_id']} to session {args.session} at "
             f"{entry['logged_at'].isoformat(timespec='seconds')}"
@@ -483,34 +2117,90 @@ def _handle_log(args: argparse.Namespace) -> int:
         return 0
 
     if args.log_command == "list":
-        if args.session is None:
-            entries = log.all_entries()
-        else:
-            session_index = _normalize_session_index(args.session, session_count)
-            entries = log.entries_for(session_index)
-
-        if not entries:
+        session_index = (
+            None
+            if args.session is None
+            else _normalize_session_index(args.session, session_count)
+        )
+        entries = _select_entries(log, args.since, args.until, session_index)
+        if args.archived and _print_archived(
+            log_path,
+            lambda archived: _select_entries(
+                archived, args.since, args.until, session_index
+            ),
+            args.since,
+            args.until,
+            session_index,
+        ):
+            if entries:
+                print("Current log:")
+        elif not entries:
             if args.session is None:
                 print("No log entries found.")
             else:
                 print(f"No log entries for session {args.session}.")
             return 0
 
-        for entry in entries:
-            timestamp = entry["logged_at"].isoformat(timespec="seconds")
-            print(
-                f"[{entry['entry_id']}] Session {entry['session_index'] + 1} "
-                f"{timestamp}: {entry['notes']}"
-            )
+        _print_entries(entries)
+        return 0
+
+    if args.log_command == "search":
+        session_index = (
+            None
+            if args.session is None
+            else _normalize_session_index(args.session, session_count)
+        )
+        entries = log.search(args.query, session_index)
+        if args.archived and _print_archived(
+            log_path,
+            lambda archived: archived.search(args.query, session_index),
+            session_index=session_index,
+        ):
+            if entries:
+                print("Current log:")
+        elif not entries:
+            print(f"No log entries matching '{args.query}'.")
+            return 0
+
+        _print_entries(entries)
         return 0
 
+    if args.log_command == "archive":
+        segment = _archive_practice_log(log_path, log, plan_data)
+        _save_practice_log(
+            log_path, PracticeLog(session_count, next_id=log.next_id), args.compact_json
+        )
+        _forget_synced_entries(
+            Path(args.sync_state)
+            if args.sync_state
+            else _default_sync_state_path(args.config),
+            {entry["entry_id"] for entry in log.all_entries()},
+        )
+        print(
+            f"Archived {segment['entry_count']} entries and {segment['done_count']} "
+            f"completed sessions to {_archive_dir(log_path) / segment['file']}"
+        )
+        return 0
+
+    if args.log_command == "import":
+        imported, errors = _import_entries(log, Path(args.path), args.format)
+        for error in errors:
+            print(error, file=sys.stderr)
+        if imported:
+            _save_practice_log(log_path, log, args.compact_json)
+        print(
+            f"Imported {imported} entries from {args.path}"
+            + (f" ({len(errors)} rows rejected)" if errors else "")
+        )
+        return 1 if errors else 0
+
     if args.log_command == "delete":
         try:
             removed = log.remove_entry(args.entry_id)
         except ValueError as exc:
             raise SystemExit(str(exc)) from exc
 
-        _save_practice_log(log_path, log)
+        _save_practice_log(log_path, log, args.compact_json)
         print(
             f"Removed entry {removed['entry_id']} from session "
             f"{removed['session_index'] + 1}"
@@ -521,7 +2211,7 @@ def _handle_log(args: argparse.Namespace) -> int:
         session_index = _normalize_session_index(args.session, session_count)
         updated = log.mark_done(session_index)
         if updated:
-            _save_practice_log(log_path, log)
+            _save_practice_log(log_path, log, args.compact_json)
             print(f"Marked session {args.session} as done: **X**")
         else:
             print(f"Session {args.session} was already marked as done: **X**")
@@ -530,33 +2220,21 @@ def _handle_log(args: argparse.Namespace) -> int:
     raise SystemExit("Unknown log command")
 
 
-def _handle_render(args: argparse.Namespace) -> int:
-    config = _load_config(args.config)
-    session_count = config["sessions"]
+def _render_output_paths(args: argparse.Namespace) -> Dict[str, str]:
+    outputs = {
+        output_format: getattr(args, output_format)
+        for output_format in _RENDERERS
+        if getattr(args, output_format)
+    }
+    if not outputs:
+        raise SystemExit("Choose at least one of --markdown, --html, --csv or --text")
+    return outputs
 
-    plan_path = Path(args.plan_json) if args.plan_json else _default_plan_path(
-        args.config
-    )
-    try:
-        with open(plan_path, "r", encoding="utf-8") as plan_file:
-            plan_data = json.load(plan_file)
-    except OSError as exc:  # pragma: no cover - defensive guard
-        raise SystemExit(f"Failed to read plan JSON: {exc}") from exc
-    except json.JSONDecodeError as exc:  # pragma: no cover - defensive guard
-        raise SystemExit(f"Invalid plan JSON: {exc}") from exc
 
-    plan_sessions = int(plan_data.get("session_count", 0))
-    if plan_sessions != session_count:
-        raise SystemExit(
-            f"Plan session count {plan_sessions} does not match config sessions "
-            f"{session_count}. Regenerate the plan before rendering."
-        )
-    config_hash = plan_data.get("config_hash")
-    if config_hash and config_hash != _config_hash(args.config):
-        raise SystemExit(
-            "Configuration has changed since the plan was generated. "
-            "Regenerate the plan before rendering."
-        )
+def _load_render_plan(
+    plan_path: Path, config_path: str, session_count: int
+) -> tuple[List[List[str]], Dict[str, int], str]:
+    plan_data = _read_plan_json(plan_path, config_path, session_count, "rendering")
 
     plan = plan_data.get("plan")
     picks = plan_data.get("picks")
@@ -565,29 +2243,464 @@ def _handle_render(args: argparse.Namespace) -> int:
         generated_on, str
     ):
         raise SystemExit("Plan JSON missing required keys for rendering.")
+    return plan, picks, generated_on
+
+
+def _write_render_outputs(
+    outputs: Mapping[str, str],
+    plan: Sequence[Sequence[str]],
+    picks: Dict[str, int],
+    generated_on: str,
+    done_marks: Mapping[int, datetime.datetime | None],
+) -> None:
+    # Build the table once and hand the same rows to every format.
+    table = _build_render_table(plan, picks, generated_on, done_marks=done_marks)
+    for output_format, output_path in outputs.items():
+        try:
+            with open(output_path, "w", encoding="utf-8", newline="") as output_file:
+                output_file.write(_RENDERERS[output_format](table))
+        except OSError as exc:  # pragma: no cover - defensive guard
+            raise SystemExit(f"Failed to write {output_format} output: {exc}") from exc
+        print(f"Wrote {output_format} with completion marks to {output_path}")
+
+
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _watch_render(
+    args: argparse.Namespace,
+    sleep: Callable[[float], None] = time.sleep,
+    max_renders: int | None = None,
+) -> int:
+    """Re-render whenever the config, plan JSON or practice log changes.
+
+    Inputs are polled with ``stat``; only the files that changed are parsed
+    again. A change is rendered once the files have stopped changing for
+    ``--debounce`` seconds, so a burst of log writes produces one render.
+    """
+    outputs = _render_output_paths(args)
+    config_path = Path(args.config)
+    plan_path = Path(args.plan_json) if args.plan_json else _default_plan_path(
+        args.config
+    )
+    log_path = Path(args.log_file) if args.log_file else _default_log_path(
+        args.config
+    )
+    watched = {"config": config_path, "plan": plan_path, "log": log_path}
+
+    def signatures() -> Dict[str, tuple[int, int] | None]:
+        return {name: _file_signature(path) for name, path in watched.items()}
+
+    session_count = _load_config(args.config)["sessions"]
+    plan, picks, generated_on = _load_render_plan(
+        plan_path, args.config, session_count
+    )
+    log = _load_practice_log(log_path, session_count)
+    seen = signatures()
+    _write_render_outputs(outputs, plan, picks, generated_on, log.done_sessions())
+    renders = 1
+    print(f"Watching {', '.join(str(path) for path in watched.values())}")
+
+    try:
+        while max_renders is None or renders < max_renders:
+            sleep(args.interval)
+            current = signatures()
+            if current == seen:
+                continue
+            while True:
+                sleep(args.debounce)
+                settled = signatures()
+                if settled == current:
+                    break
+                current = settled
+
+            changed = {name for name in watched if current[name] != seen[name]}
+            seen = current
+            try:
+                if "config" in changed:
+                    session_count = _load_config(args.config)["sessions"]
+                    changed |= {"plan", "log"}
+                if "plan" in changed:
+                    plan, picks, generated_on = _load_render_plan(
+                        plan_path, args.config, session_count
+                    )
+                if "log" in changed:
+                    log = _load_practice_log(log_path, session_count)
+                _write_render_outputs(
+                    outputs, plan, picks, generated_on, log.done_sessions()
+                )
+            except SystemExit as exc:
+                print(f"Skipped render: {exc}", file=sys.stderr)
+            renders += 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _handle_render(args: argparse.Namespace) -> int:
+    if args.watch:
+        return _watch_render(args)
+
+    outputs = _render_output_paths(args)
+    config = _load_config(args.config)
+    session_count = config["sessions"]
+
+    plan_path = Path(args.plan_json) if args.plan_json else _default_plan_path(
+        args.config
+    )
+    plan, picks, generated_on = _load_render_plan(
+        plan_path, args.config, session_count
+    )
+
+    log_path = Path(args.log_file) if args.log_file else _default_log_path(
+        args.config
+    )
+    log = _load_practice_log(log_path, session_count)
+    _write_render_outputs(outputs, plan, picks, generated_on, log.done_sessions())
+    return 0
+
 
+def _handle_stats(args: argparse.Namespace) -> int:
+    config = _load_config(args.config)
+    session_count = config["sessions"]
     log_path = Path(args.log_file) if args.log_file else _default_log_path(
         args.config
     )
     log = _load_practice_log(log_path, session_count)
-    done_marks = log.done_sessions()
 
+    plan_path = Path(args.plan_json) if args.plan_json else _default_plan_path(
+        args.config
+    )
+    if plan_path.exists():
+        plan_data = _read_plan_json(
+            plan_path, args.config, session_count, "reading stats"
+        )
+        plan = plan_data.get("plan")
+        if not isinstance(plan, list):
+            raise SystemExit("Plan JSON missing plan rows for stats.")
+        log.attach_plan(plan)
+
+    stats = log.stats()
+    print(
+        f"Sessions done: {stats['done_count']}/{stats['session_count']} "
+        f"({stats['completion_rate']:.0%})"
+    )
+    print(f"Longest streak: {stats['longest_streak']} sessions")
+    print(
+        f"Log entries: {stats['entry_count']} across "
+        f"{stats['sessions_with_notes']} sessions "
+        f"({stats['notes_per_session']:.2f} per session)"
+    )
+    for label, key in (("First done", "first_done_at"), ("Last done", "last_done_at")):
+        value = stats[key]
+        if value is not None:
+            print(f"{label}: {value.isoformat(timespec='seconds')}")
+
+    if stats["option_counts"]:
+        print("\nPractice Counts:")
+        for option, count in sorted(stats["option_counts"].items()):
+            print(f"{option}: {count}")
+    return 0
+
+
+class _BackgroundSaver:
+    """Write the practice log from a worker thread, coalescing bursts of edits.
+
+    Edits call ``request``; the worker waits ``delay`` seconds so a run of
+    keypresses becomes one write, then snapshots the log under ``lock`` and
+    encodes and writes it outside the lock. ``close`` flushes what is left.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        log: PracticeLog,
+        lock: threading.Lock,
+        delay: float = 0.5,
+        compact: bool = False,
+    ):
+        self._path = path
+        self._log = log
+        self._lock = lock
+        self._delay = delay
+        self._compact = compact
+        self._pending = threading.Event()
+        self._closing = False
+        self.saves = 0
+        self.error: str | None = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def request(self) -> None:
+        self._pending.set()
+
+    def _run(self) -> None:
+        while not self._closing:
+            self._pending.wait()
+            if self._closing:
+                return
+            time.sleep(self._delay)
+            self._save()
+
+    def _save(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            data = self._log.to_json()
+        try:
+            _write_data_file(self._path, _json_dumps(data, self._compact))
+        except OSError as exc:
+            self.error = f"Failed to write log file: {exc}"
+            return
+        self.saves += 1
+
+    def close(self) -> None:
+        self._closing = True
+        pending = self._pending.is_set()
+        self._pending.set()
+        self._thread.join()
+        if pending:
+            self._save()
+
+
+class _TuiState:
+    """What the terminal UI shows, kept separate from curses so it can be tested.
+
+    Edits mark only the rows they touch in ``dirty_rows``; ``full_redraw`` is
+    set when the viewport scrolls or the terminal resizes.
+    """
+
+    def __init__(
+        self,
+        plan: Sequence[Sequence[str]],
+        log: PracticeLog,
+        lock: threading.Lock,
+        saver: _BackgroundSaver,
+    ):
+        self.plan = plan
+        self.log = log
+        self.lock = lock
+        self.saver = saver
+        self.selected = 0
+        self.top = 0
+        self.dirty_rows: Set[int] = set()
+        self.full_redraw = True
+        self.notes_dirty = True
+        self.status = "j/k move  d done  n note  x delete note  q quit"
+
+    def row_text(self, session_index: int) -> str:
+        marker = ">" if session_index == self.selected else " "
+        done = "X" if self.log.is_done(session_index) else " "
+        note_count = len(self.log.entries_for(session_index))
+        plural = "" if note_count == 1 else "s"
+        notes = f"  ({note_count} note{plural})" if note_count else ""
+        items = ", ".join(self.plan[session_index])
+        return f"{marker} {session_index + 1:02d} [{done}] {items}{notes}"
+
+    def move(self, delta: int, rows_visible: int) -> None:
+        previous = self.selected
+        self.selected = max(0, min(len(self.plan) - 1, self.selected + delta))
+        if self.selected == previous:
+            return
+        self.dirty_rows.update((previous, self.selected))
+        self.notes_dirty = True
+        if self.selected < self.top:
+            self.top = self.selected
+            self.full_redraw = True
+        elif self.selected >= self.top + rows_visible:
+            self.top = self.selected - rows_visible + 1
+            self.full_redraw = True
+
+    def _edited(self, status: str) -> None:
+        self.dirty_rows.add(self.selected)
+        self.notes_dirty = True
+        self.status = status
+        self.saver.request()
+
+    def mark_done(self) -> None:
+        with self.lock:
+            changed = self.log.mark_done(self.selected)
+        if changed:
+            self._edited(f"Marked session {self.selected + 1} done")
+        else:
+            self.status = f"Session {self.selected + 1} is already done"
+
+    def add_note(self, notes: str) -> None:
+        notes = notes.strip()
+        if not notes:
+            self.status = "Notes cannot be empty"
+            return
+        with self.lock:
+            entry = self.log.add_entry(self.selected, notes)
+        self._edited(f"Added entry {entry['entry_id']}")
+
+    def delete_note(self, entry_id: int) -> None:
+        if all(
+            entry["entry_id"] != entry_id
+            for entry in self.log.entries_for(self.selected)
+        ):
+            self.status = f"No entry {entry_id} in session {self.selected + 1}"
+            return
+        with self.lock:
+            self.log.remove_entry(entry_id)
+        self._edited(f"Deleted entry {entry_id}")
+
+
+def _tui_prompt(screen: "curses.window", label: str) -> str:
+    height, width = screen.getmaxyx()
+    screen.move(height - 1, 0)
+    screen.clrtoeol()
+    screen.addnstr(height - 1, 0, label, width - 1)
+    curses.echo()
     try:
-        with open(args.markdown, "w", encoding="utf-8") as markdown_file:
-            markdown_file.write(
-                _format_markdown(plan, picks, generated_on, done_marks=done_marks)
-            )
-    except OSError as exc:  # pragma: no cover - defensive guard
-        raise SystemExit(f"Failed to write Markdown output: {exc}") from exc
+        curses.curs_set(1)
+    except curses.error:  # pragma: no cover - terminal without cursor control
+        pass
+    try:
+        raw = screen.getstr(height - 1, min(len(label), width - 1))
+    finally:
+        curses.noecho()
+        try:
+            curses.curs_set(0)
+        except curses.error:  # pragma: no cover - terminal without cursor control
+            pass
+    return raw.decode("utf-8", errors="replace")
+
+
+def _draw_tui(screen: "curses.window", state: _TuiState) -> None:
+    height, width = screen.getmaxyx()
+    notes_height = min(6, max(0, height - 3))
+    rows_visible = max(1, height - notes_height - 1)
+
+    if state.full_redraw:
+        screen.erase()
+        rows = range(state.top, min(len(state.plan), state.top + rows_visible))
+        state.notes_dirty = True
+    else:
+        rows = sorted(
+            row
+            for row in state.dirty_rows
+            if state.top <= row < state.top + rows_visible
+        )
+    for row in rows:
+        line = row - state.top
+        screen.move(line, 0)
+        screen.clrtoeol()
+        attribute = curses.A_REVERSE if row == state.selected else curses.A_NORMAL
+        screen.addnstr(line, 0, state.row_text(row), width - 1, attribute)
+
+    if state.notes_dirty and notes_height:
+        entries = state.log.entries_for(state.selected)
+        lines = [f"Notes for session {state.selected + 1}:"] + [
+            f"  [{entry['entry_id']}] {entry['notes']}" for entry in entries
+        ]
+        for offset in range(notes_height):
+            screen.move(rows_visible + offset, 0)
+            screen.clrtoeol()
+            if offset < len(lines):
+                screen.addnstr(rows_visible + offset, 0, lines[offset], width - 1)
+
+    screen.move(height - 1, 0)
+    screen.clrtoeol()
+    screen.addnstr(height - 1, 0, state.saver.error or state.status, width - 1)
+    state.dirty_rows.clear()
+    state.full_redraw = False
+    state.notes_dirty = False
+    screen.refresh()
+
+
+def _run_tui(screen: "curses.window", state: _TuiState) -> None:
+    try:
+        curses.curs_set(0)
+    except curses.error:  # pragma: no cover - terminal without cursor control
+        pass
+    moves = {
+        curses.KEY_UP: -1,
+        ord("k"): -1,
+        curses.KEY_DOWN: 1,
+        ord("j"): 1,
+    }
+    while True:
+        _draw_tui(screen, state)
+        key = screen.getch()
+        height, _ = screen.getmaxyx()
+        rows_visible = max(1, height - min(6, max(0, height - 3)) - 1)
+        if key in (ord("q"), 27):
+            return
+        if key in moves:
+            state.move(moves[key], rows_visible)
+        elif key == curses.KEY_NPAGE:
+            state.move(rows_visible, rows_visible)
+        elif key == curses.KEY_PPAGE:
+            state.move(-rows_visible, rows_visible)
+        elif key in (curses.KEY_HOME, ord("g")):
+            state.move(-len(state.plan), rows_visible)
+        elif key in (curses.KEY_END, ord("G")):
+            state.move(len(state.plan), rows_visible)
+        elif key == ord("d"):
+            state.mark_done()
+        elif key == ord("n"):
+            state.add_note(_tui_prompt(screen, "Note: "))
+        elif key == ord("x"):
+            raw = _tui_prompt(screen, "Delete entry id: ").strip()
+            if raw.isdigit():
+                state.delete_note(int(raw))
+            else:
+                state.status = "Enter the numeric id shown in the notes pane"
+        elif key == curses.KEY_RESIZE:
+            state.full_redraw = True
 
-    print(f"Wrote Markdown with completion marks to {args.markdown}")
+
+def _handle_tui(args: argparse.Namespace) -> int:
+    if curses is None:  # pragma: no cover - not available on Windows
+        raise SystemExit("The terminal UI needs the curses module")
+    config = _load_config(args.config)
+    session_count = config["sessions"]
+    plan_path = Path(args.plan_json) if args.plan_json else _default_plan_path(
+        args.config
+    )
+    if not plan_path.exists():
+        raise SystemExit(
+            f"Plan JSON not found at {plan_path}. Run generate with --plan-json first."
+        )
+    plan, _, _ = _load_render_plan(plan_path, args.config, session_count)
+    log_path = Path(args.log_file) if args.log_file else _default_log_path(args.config)
+    log = _load_practice_log(log_path, session_count)
+
+    lock = threading.Lock()
+    saver = _BackgroundSaver(log_path, log, lock, compact=args.compact_json)
+    try:
+        curses.wrapper(_run_tui, _TuiState(plan, log, lock, saver))
+    finally:
+        saver.close()
+    if saver.error:
+        raise SystemExit(saver.error)
+    print(f"Saved practice log to {log_path}")
     return 0
 
 
 def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
     argv = list(argv)
-    if argv and argv[0] not in {"generate", "log", "render"}:
+    if argv and argv[0] not in {
+        "generate",
+        "next",
+        "log",
+        "render",
+        "stats",
+        "store",
+        "tui",
+    }:
         argv = ["generate"] + argv
+    if argv[:1] == ["log"] and any(
+        arg == "--user" or arg.startswith("--user=") for arg in argv
+    ):
+        # An optional config before log's own subcommands would swallow the
+        # subcommand name, so store routines get an empty config slot instead.
+        argv.insert(1, "")
 
     parser = argparse.ArgumentParser(
         description="Generate a randomized practice routine from a JSON config"
@@ -597,7 +2710,15 @@ def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
     generate_parser = subparsers.add_parser(
         "generate", help="Create a new practice plan"
     )
-    generate_parser.add_argument("config", help="Path to routine configuration JSON file")
+    generate_parser.add_argument(
+        "config",
+        nargs="*",
+        help=(
+            "Path to routine configuration JSON file; pass several paths or a "
+            "directory to generate plans for each config in parallel"
+        ),
+    )
+    _add_store_arguments(generate_parser)
     generate_parser.add_argument(
         "--seed",
         type=int,
@@ -617,13 +2738,80 @@ def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
             "(defaults to config.plan.json when --markdown is used)"
         ),
     )
+    generate_parser.add_argument(
+        "--rebase",
+        action="store_true",
+        help=(
+            "Keep sessions up to the last one marked done in the practice log "
+            "and re-plan only the rest under the current config"
+        ),
+    )
+    generate_parser.add_argument(
+        "--log-file",
+        metavar="PATH",
+        help="Practice log used by --rebase (defaults to alongside config)",
+    )
+    generate_parser.add_argument(
+        "--markdown-dir",
+        metavar="DIR",
+        help="Directory for per-config Markdown output when generating several configs",
+    )
+    generate_parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        help="Write plan JSON without indentation (smaller, for machine-only use)",
+    )
+    generate_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes for multi-config generation (defaults to CPU count)",
+    )
+
+    next_parser = subparsers.add_parser(
+        "next",
+        help="Plan the next sessions of an open-ended routine from a saved cursor",
+    )
+    next_parser.add_argument(
+        "config",
+        nargs="?",
+        help="Path to the configuration JSON file for the routine",
+    )
+    _add_store_arguments(next_parser)
+    next_parser.add_argument(
+        "--count",
+        type=int,
+        default=7,
+        help="Number of sessions to plan (default: 7)",
+    )
+    next_parser.add_argument(
+        "--cursor",
+        metavar="PATH",
+        help="Cursor file recording planner state (defaults to config.cursor.json)",
+    )
+    next_parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="RNG seed used when starting a new cursor without a config seed",
+    )
+    next_parser.add_argument(
+        "--peek",
+        action="store_true",
+        help="Show the next sessions without advancing the cursor",
+    )
 
     log_parser = subparsers.add_parser(
-        "log", help="Add/list/delete practice log entries or mark sessions done"
+        "log",
+        help=(
+            "Add/list/search/import/delete practice log entries "
+            "or mark sessions done"
+        ),
     )
     log_parser.add_argument(
         "config", help="Path to the configuration JSON file for the routine"
     )
+    _add_store_arguments(log_parser)
     log_parser.add_argument(
         "--log-file",
         metavar="PATH",
@@ -635,6 +2823,12 @@ def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
         help="Path to plan JSON for validation (defaults to alongside config)",
     )
 
+    log_parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        help="Write the practice log without indentation (for machine-only use)",
+    )
+
     log_subparsers = log_parser.add_subparsers(dest="log_command", required=True)
 
     log_add = log_subparsers.add_parser("add", help="Add a practice log entry")
@@ -652,6 +2846,71 @@ def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
         type=int,
         help="Optional 1-based session index to filter entries",
     )
+    log_list.add_argument(
+        "--since",
+        type=_parse_time_bound,
+        metavar="DATE",
+        help="Only list entries logged at or after this ISO date/datetime",
+    )
+    log_list.add_argument(
+        "--until",
+        type=lambda value: _parse_time_bound(value, end_of_day=True),
+        metavar="DATE",
+        help="Only list entries logged before this ISO datetime (dates are inclusive)",
+    )
+
+    log_list.add_argument(
+        "--archived",
+        action="store_true",
+        help="Also list matching entries from archived plan periods",
+    )
+
+    log_search = log_subparsers.add_parser(
+        "search", help="Find log entries whose notes contain every given word"
+    )
+    log_search.add_argument("query", help="Words to look for in entry notes")
+    log_search.add_argument(
+        "--session",
+        type=int,
+        help="Optional 1-based session index to filter entries",
+    )
+    log_search.add_argument(
+        "--archived",
+        action="store_true",
+        help="Also search archived plan periods",
+    )
+
+    log_archive = log_subparsers.add_parser(
+        "archive",
+        help=(
+            "Move the current log into a compressed, read-only archive segment "
+            "and start an empty one (e.g. when a plan period is finished)"
+        ),
+    )
+    log_archive.add_argument(
+        "--sync-state",
+        metavar="PATH",
+        help=(
+            "Sync cursor file to keep in step, as passed to 'sync --state' "
+            "(defaults to config.sync.json)"
+        ),
+    )
+
+    log_import = log_subparsers.add_parser(
+        "import", help="Bulk-load log entries from a CSV or JSONL file"
+    )
+    log_import.add_argument(
+        "path",
+        help=(
+            "File with session, notes and optional ISO logged_at fields "
+            "(CSV header row or one JSON object per line)"
+        ),
+    )
+    log_import.add_argument(
+        "--format",
+        choices=["csv", "jsonl"],
+        help="Input format (defaults to csv for .csv files, jsonl otherwise)",
+    )
 
     log_done = log_subparsers.add_parser("done", help="Mark a session as completed")
     log_done.add_argument(
@@ -670,11 +2929,15 @@ def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
     )
 
     render_parser = subparsers.add_parser(
-        "render", help="Render Markdown from an existing plan and log status"
+        "render",
+        help="Render Markdown/HTML/CSV/text from an existing plan and log status",
     )
     render_parser.add_argument(
-        "config", help="Path to the configuration JSON file for the routine"
+        "config",
+        nargs="?",
+        help="Path to the configuration JSON file for the routine",
     )
+    _add_store_arguments(render_parser)
     render_parser.add_argument(
         "--plan-json",
         metavar="PATH",
@@ -687,22 +2950,225 @@ def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
     )
     render_parser.add_argument(
         "--markdown",
-        required=True,
         metavar="PATH",
         help="Markdown output path reflecting completion status",
     )
+    render_parser.add_argument(
+        "--html",
+        metavar="PATH",
+        help="HTML output path (includes print styles for PDF export)",
+    )
+    render_parser.add_argument(
+        "--csv",
+        metavar="PATH",
+        help="CSV output path with one row per session",
+    )
+    render_parser.add_argument(
+        "--text",
+        metavar="PATH",
+        help="Fixed-width plain text output path for printing",
+    )
+    render_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-render whenever the config, plan or log changes",
+    )
+    render_parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Seconds between checks for changed inputs in --watch mode",
+    )
+    render_parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.5,
+        help="Seconds inputs must stay unchanged before a --watch re-render",
+    )
+
+    stats_parser = subparsers.add_parser(
+        "stats", help="Summarize completion, streaks and notes from the practice log"
+    )
+    stats_parser.add_argument(
+        "config",
+        nargs="?",
+        help="Path to the configuration JSON file for the routine",
+    )
+    _add_store_arguments(stats_parser)
+    stats_parser.add_argument(
+        "--plan-json",
+        metavar="PATH",
+        help="Path to plan JSON for per-option counts (defaults to alongside config)",
+    )
+    stats_parser.add_argument(
+        "--log-file",
+        metavar="PATH",
+        help="Path to the practice log JSON file (defaults to alongside config)",
+    )
+
+    tui_parser = subparsers.add_parser(
+        "tui", help="Browse sessions, mark them done and edit notes interactively"
+    )
+    tui_parser.add_argument(
+        "config",
+        nargs="?",
+        help="Path to the configuration JSON file for the routine",
+    )
+    _add_store_arguments(tui_parser)
+    tui_parser.add_argument(
+        "--plan-json",
+        metavar="PATH",
+        help="Path to the plan JSON to browse (defaults to alongside config)",
+    )
+    tui_parser.add_argument(
+        "--log-file",
+        metavar="PATH",
+        help="Path to the practice log JSON file (defaults to alongside config)",
+    )
+    tui_parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        help="Write the practice log without indentation",
+    )
+
+    store_parser = subparsers.add_parser(
+        "store", help="Manage routines kept per user in a local routine store"
+    )
+    store_parser.add_argument(
+        "--store",
+        metavar="DIR",
+        default=str(_DEFAULT_STORE),
+        help=f"Routine store directory (defaults to {_DEFAULT_STORE})",
+    )
+    store_subparsers = store_parser.add_subparsers(
+        dest="store_command", required=True
+    )
+
+    store_add = store_subparsers.add_parser(
+        "add", help="Copy a config (and optional plan/log) into the store"
+    )
+    store_add.add_argument("config", help="Path to the routine configuration JSON")
+    store_add.add_argument("--user", required=True, help="User id")
+    store_add.add_argument("--plan", required=True, help="Plan id for this routine")
+    store_add.add_argument("--plan-json", metavar="PATH", help="Existing plan JSON")
+    store_add.add_argument("--log-file", metavar="PATH", help="Existing practice log")
+    store_add.add_argument(
+        "--no-activate",
+        action="store_true",
+        help="Keep the user's current active plan",
+    )
+
+    store_activate = store_subparsers.add_parser(
+        "activate", help="Make a plan the user's active plan"
+    )
+    store_activate.add_argument("--user", required=True, help="User id")
+    store_activate.add_argument("--plan", required=True, help="Plan id to activate")
+
+    store_list = store_subparsers.add_parser(
+        "list", help="List users, or one user's plans"
+    )
+    store_list.add_argument("--user", help="List this user's plans")
 
     return parser.parse_args(argv)
 
 
+def _add_store_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--user",
+        help="Use this user's routine from the store instead of a config path",
+    )
+    parser.add_argument(
+        "--plan",
+        help="Plan id within the user's routines (defaults to the active plan)",
+    )
+    parser.add_argument(
+        "--store",
+        metavar="DIR",
+        default=str(_DEFAULT_STORE),
+        help=f"Routine store directory for --user (defaults to {_DEFAULT_STORE})",
+    )
+
+
+def _apply_store(args: argparse.Namespace) -> None:
+    """Point config/plan/log paths at the store routine named by --user/--plan."""
+    if args.user is None:
+        if args.plan is not None:
+            raise SystemExit("--plan requires --user")
+        if not args.config:
+            raise SystemExit("Pass a config path or select a routine with --user")
+        return
+    if args.config:
+        raise SystemExit("Pass either a config path or --user/--plan, not both")
+
+    store = RoutineStore(Path(args.store))
+    try:
+        paths = store.resolve(args.user, args.plan)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+    finally:
+        store.close()
+
+    config_path = str(paths["config"])
+    args.config = [config_path] if args.command == "generate" else config_path
+    if args.command != "next":
+        args.plan_json = args.plan_json or str(paths["plan_json"])
+        args.log_file = args.log_file or str(paths["log_file"])
+
+
+def _handle_store(args: argparse.Namespace) -> int:
+    store = RoutineStore(Path(args.store))
+    try:
+        if args.store_command == "add":
+            store.add_plan(
+                args.user,
+                args.plan,
+                Path(args.config),
+                Path(args.plan_json) if args.plan_json else None,
+                Path(args.log_file) if args.log_file else None,
+                activate=not args.no_activate,
+            )
+            print(f"Added plan {args.plan} for user {args.user} in {args.store}")
+            return 0
+
+        if args.store_command == "activate":
+            store.activate(args.user, args.plan)
+            print(f"Active plan for user {args.user} is now {args.plan}")
+            return 0
+
+        if args.store_command == "list":
+            if args.user is None:
+                for user_id in store.users():
+                    print(user_id)
+                return 0
+            active = store.active_plan(args.user)
+            for plan_id in store.plans(args.user):
+                print(f"{plan_id}{' (active)' if plan_id == active else ''}")
+            return 0
+    except (OSError, ValueError) as exc:
+        raise SystemExit(str(exc)) from exc
+    finally:
+        store.close()
+
+    raise SystemExit("Unknown store command")
+
+
 def main(argv: Sequence[str]) -> int:
     args = _parse_args(argv)
+    if args.command == "store":
+        return _handle_store(args)
+    _apply_store(args)
     if args.command == "generate":
         return _handle_generate(args)
+    if args.command == "next":
+        return _handle_next(args)
     if args.command == "log":
         return _handle_log(args)
     if args.command == "render":
         return _handle_render(args)
+    if args.command == "stats":
+        return _handle_stats(args)
+    if args.command == "tui":
+        return _handle_tui(args)
     raise SystemExit("Unknown command")
 
 
@@ -0,0 +1,287 @@
+"""Unit tests for the Firestore migration script."""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from migrate_to_firestore import LocalDocumentStore, migrate, sync
+from routinely import (
+    PracticeLog,
+    _load_practice_log,
+    _save_practice_log,
+    main,
+)
+
+
+class MigrateTests(unittest.TestCase):
+    def _write_json(self, directory: str, name: str, data: dict) -> Path:
+        path = Path(directory) / name
+        path.write_text(json.dumps(data), encoding="utf-8")
+        return path
+
+    def test_migrate_into_local_store_counts_round_trips(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            args = argparse.Namespace(
+                user_id="alice",
+                config=self._write_json(directory, "routine.json", {}),
+                plan_json=self._write_json(
+                    directory,
+                    "routine.plan.json",
+                    {
+                        "generated_on": "Jan 01 2024",
+                        "session_count": 2,
+                        "plan": [["Scales"], ["Chords"]],
+                        "picks": {"Scales": 1, "Chords": 1},
+                    },
+                ),
+                log_json=self._write_json(
+                    directory,
+                    "routine.practice_log.json",
+                    {
+                        "done_sessions": [
+                            {"session_index": 1, "completed_at": "2024-01-02T08:00:00"}
+                        ],
+                        "entries": [
+                            {
+                                "entry_id": 1,
+                                "session_index": 1,
+                                "notes": "80bpm",
+                                "logged_at": "2024-01-02T08:30:00",
+                            }
+                        ],
+                    },
+                ),
+                plan_id=None,
+            )
+            store = LocalDocumentStore()
+            self.addCleanup(store.close)
+
+            with mock.patch("builtins.print"):
+                migrate(args, store, LocalDocumentStore.SERVER_TIMESTAMP)
+
+            # One plan document, two sessions and one log entry.
+            self.assertEqual(store.round_trips, 4)
+            self.assertGreater(store.bytes_written, 0)
+            plan_ref = (
+                store.collection("users")
+                .document("alice")
+                .collection("plans")
+                .document("routine-Jan_01_2024")
+            )
+            self.assertEqual(plan_ref.get()["sessionCount"], 2)
+            sessions = plan_ref.collection("sessions").documents()
+            self.assertEqual([doc_id for doc_id, _ in sessions], ["00", "01"])
+            self.assertTrue(sessions[1][1]["done"])
+            self.assertEqual(sessions[1][1]["completedAt"], "2024-01-02T08:00:00")
+            logs = plan_ref.collection("sessions").document("01").collection("logs")
+            ((entry_key, entry),) = logs.documents()
+            self.assertEqual(len(entry_key), 20)
+            self.assertEqual(entry["notes"], "80bpm")
+            self.assertEqual(entry["planPath"], plan_ref.path)
+            self.assertIn("updatedAt", sessions[1][1])
+
+    def test_sync_exchanges_only_changes_between_devices(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            config = self._write_json(
+                directory,
+                "routine.json",
+                {
+                    "options": ["A", "B"],
+                    "items_per_session": 1,
+                    "max_gap": 1,
+                    "sessions": 3,
+                },
+            )
+            devices = {}
+            for name in ("laptop", "phone"):
+                devices[name] = argparse.Namespace(
+                    user_id="alice",
+                    plan_id="jan",
+                    config=config,
+                    log_json=Path(directory) / f"{name}.practice_log.json",
+                    state=Path(directory) / f"{name}.sync.json",
+                )
+            laptop = PracticeLog(3)
+            laptop.add_entry(0, "80bpm", datetime.datetime(2024, 1, 1, 8, 0))
+            laptop.mark_done(0, datetime.datetime(2024, 1, 1, 9, 0))
+            _save_practice_log(devices["laptop"].log_json, laptop)
+            phone = PracticeLog(3)
+            phone.add_entry(1, "new song", datetime.datetime(2024, 1, 2, 8, 0))
+            _save_practice_log(devices["phone"].log_json, phone)
+            store = LocalDocumentStore()
+            self.addCleanup(store.close)
+
+            def run(name: str) -> PracticeLog:
+                with mock.patch("builtins.print"):
+                    sync(devices[name], store, LocalDocumentStore.SERVER_TIMESTAMP)
+                return _load_practice_log(devices[name].log_json, 3)
+
+            run("laptop")
+            phone = run("phone")
+            laptop = run("laptop")
+
+            for log in (laptop, phone):
+                self.assertEqual(
+                    sorted((e["session_index"], e["notes"]) for e in log.all_entries()),
+                    [(0, "80bpm"), (1, "new song")],
+                )
+            self.assertEqual(phone.done_at(0), datetime.datetime(2024, 1, 1, 9, 0))
+
+            # Nothing changed: one read, no writes.
+            run("phone")
+            before = store.round_trips
+            run("phone")
+            self.assertEqual(store.round_trips - before, 1)
+
+            shared = [e for e in laptop.all_entries() if e["notes"] == "80bpm"]
+            laptop.remove_entry(shared[0]["entry_id"])
+            _save_practice_log(devices["laptop"].log_json, laptop)
+            run("laptop")
+            phone = run("phone")
+            self.assertEqual([e["notes"] for e in phone.all_entries()], ["new song"])
+
+    def test_sync_matches_entries_already_held_locally(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            config = self._write_json(
+                directory,
+                "routine.json",
+                {"options": ["A"], "items_per_session": 1, "max_gap": 0, "sessions": 1},
+            )
+            log_json = Path(directory) / "routine.practice_log.json"
+            log = PracticeLog(1)
+            log.add_entry(0, "migrated", datetime.datetime(2024, 1, 1, 8, 0))
+            _save_practice_log(log_json, log)
+            store = LocalDocumentStore()
+            self.addCleanup(store.close)
+            with mock.patch("builtins.print"):
+                migrate(
+                    argparse.Namespace(
+                        user_id="alice",
+                        config=config,
+                        plan_json=self._write_json(
+                            directory,
+                            "routine.plan.json",
+                            {
+                                "generated_on": "Jan 01 2024",
+                                "session_count": 1,
+                                "plan": [["A"]],
+                                "picks": {"A": 1},
+                            },
+                        ),
+                        log_json=log_json,
+                        plan_id="jan",
+                    ),
+                    store,
+                    LocalDocumentStore.SERVER_TIMESTAMP,
+                )
+                args = argparse.Namespace(
+                    user_id="alice",
+                    plan_id="jan",
+                    config=config,
+                    log_json=log_json,
+                    state=None,
+                )
+                sync(args, store, LocalDocumentStore.SERVER_TIMESTAMP)
+                sync(args, store, LocalDocumentStore.SERVER_TIMESTAMP)
+
+            log = _load_practice_log(log_json, 1)
+            self.assertEqual([e["notes"] for e in log.all_entries()], ["migrated"])
+            plans = store.collection("users").document("alice").collection("plans")
+            session = plans.document("jan").collection("sessions").document("00")
+            self.assertEqual(len(session.collection("logs").documents()), 1)
+
+    def test_sync_keeps_wall_clock_of_utc_tagged_timestamps(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            config = self._write_json(
+                directory,
+                "routine.json",
+                {"options": ["A"], "items_per_session": 1, "max_gap": 0, "sessions": 1},
+            )
+            args = argparse.Namespace(
+                user_id="alice", plan_id="jan", config=config, log_json=None, state=None
+            )
+            store = LocalDocumentStore()
+            self.addCleanup(store.close)
+            plan_ref = (
+                store.collection("users")
+                .document("alice")
+                .collection("plans")
+                .document("jan")
+            )
+            plan_ref.collection("sessions").document("00").collection(
+                "logs"
+            ).document("remote").set(
+                {
+                    "notes": "from firestore",
+                    "loggedAt": "2024-01-01T08:00:00+00:00",
+                    "planPath": plan_ref.path,
+                    "updatedAt": LocalDocumentStore.SERVER_TIMESTAMP,
+                }
+            )
+
+            with mock.patch("builtins.print"):
+                sync(args, store, LocalDocumentStore.SERVER_TIMESTAMP)
+
+            log = _load_practice_log(Path(directory) / "routine.practice_log.json", 1)
+            self.assertEqual(
+                log.all_entries()[0]["logged_at"], datetime.datetime(2024, 1, 1, 8, 0)
+            )
+
+    def test_sync_after_archive_keeps_remote_entries(self) -> None:
+        config = {"options": ["A", "B"], "items_per_session": 1, "max_gap": 1}
+        for custom_state in (False, True):
+            with self.subTest(custom_state=custom_state):
+                store = LocalDocumentStore()
+                self.addCleanup(store.close)
+                with tempfile.TemporaryDirectory() as directory:
+                    devices = {}
+                    for name in ("a", "b"):
+                        (Path(directory) / name).mkdir()
+                        devices[name] = argparse.Namespace(
+                            user_id="alice",
+                            plan_id="jan",
+                            config=self._write_json(
+                                directory,
+                                f"{name}/routine.json",
+                                {**config, "sessions": 2},
+                            ),
+                            log_json=None,
+                            state=(
+                                Path(directory) / f"{name}/cursor.json"
+                                if custom_state
+                                else None
+                            ),
+                        )
+                    log = PracticeLog(2)
+                    log.add_entry(0, "n1", datetime.datetime(2024, 1, 1, 8, 0))
+                    log.add_entry(1, "n2", datetime.datetime(2024, 1, 2, 8, 0))
+                    _save_practice_log(
+                        Path(directory) / "a/routine.practice_log.json", log
+                    )
+                    archive_argv = ["log", str(devices["a"].config), "archive"]
+                    if custom_state:
+                        archive_argv += ["--sync-state", str(devices["a"].state)]
+
+                    server_timestamp = LocalDocumentStore.SERVER_TIMESTAMP
+                    with mock.patch("builtins.print"):
+                        for name in ("a", "b"):
+                            sync(devices[name], store, server_timestamp)
+                        main(archive_argv)
+                        for name in ("a", "b"):
+                            sync(devices[name], store, server_timestamp)
+
+                    phone_log = Path(directory) / "b/routine.practice_log.json"
+                    phone = _load_practice_log(phone_log, 2)
+                    self.assertEqual(
+                        [e["notes"] for e in phone.all_entries()], ["n1", "n2"]
+                    )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
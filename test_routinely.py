@@ -3,25 +3,46 @@
 from __future__ import annotations
 
 import datetime
+import itertools
 import json
 import os
 import random
+import shutil
 import tempfile
+import threading
+import types
 import unittest
 from pathlib import Path
 from unittest import mock
 
 from routinely import (
     PracticeLog,
+    RoutineStore,
+    SessionStreams,
+    _BackgroundSaver,
+    _TuiState,
     _config_hash,
     _build_plan,
+    _build_render_table,
     _format_markdown,
+    _gaps_after,
+    _handle_generate,
     _handle_log,
     _handle_render,
+    _iter_sessions,
     _load_config,
     _load_practice_log,
+    _plan_diff,
+    _read_plan_json,
+    _rebase_plan,
     _save_practice_log,
+    _table_to_csv,
+    _table_to_html,
+    _table_to_text,
+    _tokenize,
+    _watch_render,
     _write_plan_json,
+    main,
 )
 
 
@@ -82,6 +103,175 @@ class RoutinelyTests(unittest.TestCase):
 
         self.assertEqual(plan[0], ["alpha", "Beta", "Zebra"])
 
+    def test_build_plan_output_is_stable_for_seed(self) -> None:
+        options = ["scales", "chords", "songs", "improv", "ear training"]
+
+        plan, picks = _build_plan(options, 3, 2, 4, random.Random(42))
+
+        self.assertEqual(
+            plan,
+            [
+                ["chords", "improv", "songs"],
+                ["ear training", "improv", "scales"],
+                ["chords", "improv", "songs"],
+                ["chords", "ear training", "scales"],
+            ],
+        )
+        self.assertEqual(list(picks), options)
+        self.assertEqual(list(picks.values()), [2, 3, 2, 3, 2])
+
+    def test_build_plan_invariants_hold_for_random_configs(self) -> None:
+        for case in range(50):
+            rng = random.Random(case)
+            option_count = rng.randint(1, 30)
+            items = rng.randint(1, option_count)
+            max_gap = -(-option_count // items) - 1 + rng.randint(0, 3)
+            sessions = rng.randint(1, 40)
+            options = [f"opt{index}" for index in range(option_count)]
+
+            plan, picks = _build_plan(
+                options, items, max_gap, sessions, random.Random(case)
+            )
+
+            with self.subTest(case=case):
+                self.assertEqual(
+                    _build_plan(options, items, max_gap, sessions, random.Random(case)),
+                    (plan, picks),
+                )
+                self.assertTrue(all(len(set(row)) == items for row in plan))
+                self.assertEqual(sum(picks.values()), sessions * items)
+                for option in options:
+                    hits = [-1] + [i for i, row in enumerate(plan) if option in row]
+                    gaps = [b - a - 1 for a, b in zip(hits, hits[1:] + [sessions])]
+                    self.assertLessEqual(max(gaps), max_gap)
+                    self.assertEqual(picks[option], len(hits) - 1)
+
+    def test_build_plan_weights_favor_heavier_options(self) -> None:
+        options = [f"opt{index}" for index in range(10)]
+        weights = {"opt0": 5, "opt1": 5}
+
+        plan, picks = _build_plan(
+            options, 3, 6, 300, random.Random(1), weights=weights
+        )
+
+        self.assertEqual(
+            _build_plan(options, 3, 6, 300, random.Random(1), weights=weights),
+            (plan, picks),
+        )
+        self.assertTrue(all(len(set(row)) == 3 for row in plan))
+        for option in options:
+            hits = [-1] + [i for i, row in enumerate(plan) if option in row]
+            gaps = [b - a - 1 for a, b in zip(hits, hits[1:] + [300])]
+            self.assertLessEqual(max(gaps), 6)
+        lightest_heavy = min(picks["opt0"], picks["opt1"])
+        self.assertGreater(lightest_heavy, max(picks[o] for o in options[2:]))
+
+    def test_load_config_rejects_unknown_weights(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_path = Path(tmpdir) / "config.json"
+            config_path.write_text(
+                json.dumps(
+                    {
+                        "options": ["a", "b"],
+                        "items_per_session": 1,
+                        "max_gap": 1,
+                        "sessions": 2,
+                        "weights": {"c": 2},
+                    }
+                ),
+                encoding="utf-8",
+            )
+
+            with self.assertRaises(SystemExit):
+                _load_config(config_path)
+
+    def test_session_streams_resume_matches_serial_plan(self) -> None:
+        options = [f"Book {index}" for index in range(9)]
+
+        serial, serial_picks = _build_plan(options, 3, 3, 12, SessionStreams(5))
+        head, _ = _build_plan(options, 3, 3, 7, SessionStreams(5))
+        tail, _ = _build_plan(
+            options,
+            3,
+            3,
+            5,
+            SessionStreams(5),
+            first_session=7,
+            days_since=_gaps_after(options, head),
+        )
+
+        self.assertEqual(head + tail, serial)
+        self.assertEqual(sum(serial_picks.values()), 36)
+        self.assertNotEqual(
+            _build_plan(options, 3, 3, 12, SessionStreams(6))[0], serial
+        )
+
+    def test_weighted_plan_resumes_from_days_since_state(self) -> None:
+        options = [f"Book {index}" for index in range(12)]
+        weights = {"Book 0": 4, "Book 5": 2}
+
+        serial, _ = _build_plan(
+            options, 4, 4, 15, SessionStreams(3), weights=weights
+        )
+        for split in (1, 6, 11):
+            with self.subTest(split=split):
+                head, _ = _build_plan(
+                    options, 4, 4, split, SessionStreams(3), weights=weights
+                )
+                tail, _ = _build_plan(
+                    options,
+                    4,
+                    4,
+                    15 - split,
+                    SessionStreams(3),
+                    first_session=split,
+                    days_since=_gaps_after(options, head),
+                    weights=weights,
+                )
+                self.assertEqual(head + tail, serial)
+
+    def test_next_sessions_resume_from_saved_cursor(self) -> None:
+        options = [f"Book {index}" for index in range(8)]
+        config_path = self._write_config(
+            {
+                "options": options,
+                "items_per_session": 3,
+                "max_gap": 3,
+                "sessions": 1,
+                "seed": 4,
+                "weights": {"Book 2": 3},
+            }
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            cursor_path = str(Path(directory) / "routine.cursor.json")
+            printed: list = []
+            with mock.patch("builtins.print", printed.append):
+                main(["next", config_path, "--cursor", cursor_path, "--count", "4"])
+                main(["next", config_path, "--cursor", cursor_path, "--count", "2"])
+
+            with open(cursor_path, encoding="utf-8") as handle:
+                cursor = json.load(handle)
+
+        expected = list(
+            itertools.islice(
+                _iter_sessions(
+                    options, 3, 3, SessionStreams(4), weights={"Book 2": 3}
+                ),
+                6,
+            )
+        )
+        self.assertEqual(cursor["seed"], 4)
+        self.assertEqual(cursor["next_session"], 6)
+        self.assertEqual(cursor["days_since"], _gaps_after(options, expected))
+        self.assertEqual(
+            [line for line in printed if line.startswith("Session")],
+            [f"Session {index:02d}:" for index in range(1, 7)],
+        )
+        self.assertEqual(
+            [line.strip()[2:] for line in printed if line.startswith("  - ")],
+            [item for session in expected for item in session],
+        )
+
     def test_format_markdown_outputs_tables(self) -> None:
         plan = [["Warmup", "Scales"], ["Chords"]]
         picks = {"Warmup": 1, "Scales": 1, "Chords": 1}
@@ -107,6 +297,58 @@ class RoutinelyTests(unittest.TestCase):
         self.assertEqual(removed["notes"], "Started slow")
         self.assertEqual(log.entries_for(0), [])
 
+    def test_practice_log_search_matches_all_words(self) -> None:
+        log = PracticeLog(2)
+        first = log.add_entry(0, "Scales at 80bpm, clean")
+        log.add_entry(1, "Chords at 80BPM")
+        log.add_entry(1, "Chords at 90bpm")
+
+        self.assertEqual(len(log.search("80bpm")), 2)
+        self.assertEqual(
+            [entry["notes"] for entry in log.search("chords 80bpm")],
+            ["Chords at 80BPM"],
+        )
+        self.assertEqual(len(log.search("80bpm", session_index=0)), 1)
+
+        log.remove_entry(first["entry_id"])
+
+        self.assertEqual(log.search("scales"), [])
+        again = log.add_entry(0, "Scales again")
+        self.assertEqual(log.search("scales"), [again])
+
+    def test_practice_log_search_index_is_built_on_first_search(self) -> None:
+        log = PracticeLog(2)
+        log.add_entry(0, "Scales at 80bpm")
+        loaded = PracticeLog(2, log.all_entries())
+        with mock.patch("routinely._tokenize", side_effect=_tokenize) as tokenize:
+            loaded.add_entry(1, "Scales at 90bpm")
+            loaded.remove_entry(1)
+            self.assertEqual(tokenize.call_count, 0)
+
+            self.assertEqual(
+                [entry["notes"] for entry in loaded.search("scales")],
+                ["Scales at 90bpm"],
+            )
+
+    def test_practice_log_entries_between_uses_time_order(self) -> None:
+        log = PracticeLog(2)
+        day = datetime.datetime(2024, 1, 1)
+        late = log.add_entry(0, "late", day + datetime.timedelta(days=3))
+        log.add_entry(1, "early", day)
+        log.add_entry(1, "middle", day + datetime.timedelta(days=1))
+
+        window = log.entries_between(day, day + datetime.timedelta(days=3))
+
+        self.assertEqual([entry["notes"] for entry in window], ["early", "middle"])
+        since = log.entries_between(start=day + datetime.timedelta(days=1))
+        self.assertEqual([entry["notes"] for entry in since], ["middle", "late"])
+        reloaded = PracticeLog(2, log.all_entries())
+        self.assertEqual(reloaded.entries_between(), log.entries_between())
+
+        log.remove_entry(late["entry_id"])
+
+        self.assertEqual(len(log.entries_between()), 2)
+
     def test_practice_log_round_trip_to_disk(self) -> None:
         log = PracticeLog(3)
         stamp = datetime.datetime(2024, 1, 2, 15, 30, 0)
@@ -123,6 +365,139 @@ class RoutinelyTests(unittest.TestCase):
         self.assertEqual(entries[0]["notes"], "Great session")
         self.assertEqual(entries[0]["logged_at"], stamp)
 
+    def test_practice_log_stats_track_streaks_and_option_counts(self) -> None:
+        log = PracticeLog(5)
+        log.attach_plan([["A", "B"], ["B", "C"], ["A", "C"], ["A"], ["B"]])
+        log.mark_done(0, datetime.datetime(2024, 1, 1))
+        log.mark_done(2, datetime.datetime(2024, 1, 3))
+        log.mark_done(1, datetime.datetime(2024, 1, 2))
+        log.mark_done(4, datetime.datetime(2024, 1, 5))
+        entry = log.add_entry(1, "80bpm")
+        log.add_entry(1, "90bpm")
+        log.add_entry(3, "tired")
+        log.remove_entry(entry["entry_id"])
+
+        stats = log.stats()
+
+        self.assertEqual(stats["done_count"], 4)
+        self.assertEqual(stats["longest_streak"], 3)
+        self.assertEqual(stats["entry_count"], 2)
+        self.assertEqual(stats["sessions_with_notes"], 2)
+        self.assertEqual(stats["first_done_at"], datetime.datetime(2024, 1, 1))
+        self.assertEqual(stats["last_done_at"], datetime.datetime(2024, 1, 5))
+        self.assertEqual(stats["option_counts"], {"A": 2, "B": 3, "C": 2})
+
+    def test_practice_log_loads_identically_with_every_json_backend(self) -> None:
+        log = PracticeLog(3)
+        log.add_entry(2, "Tempo 80bpm", datetime.datetime(2024, 1, 2, 15, 30, 5, 12))
+        log.mark_done(1, datetime.datetime(2024, 1, 3, 9, 0, 0))
+        log.mark_done(0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "log.json"
+            backends = {
+                "stdlib": {"orjson": None, "msgspec": None},
+                "orjson": {"msgspec": None},
+                "msgspec": {"orjson": None},
+            }
+            loaded = {}
+            for name, disabled in backends.items():
+                with mock.patch.multiple("routinely", **disabled):
+                    _save_practice_log(path, log, compact=name == "stdlib")
+                    loaded[name] = _load_practice_log(path, 3).to_json()
+
+            self.assertEqual(json.loads(path.read_text()), log.to_json())
+
+            # Hand-written files with loose types load the same everywhere.
+            hand_written = {
+                "entries": [
+                    {
+                        "entry_id": "1",
+                        "session_index": "2",
+                        "notes": "Tempo 80bpm",
+                        "logged_at": "2024-01-02T15:30:05.000012",
+                    },
+                    {
+                        "entry_id": 2,
+                        "session_index": 0,
+                        "notes": 80,
+                        "logged_at": "2024-01-02T16:00:00",
+                    },
+                ],
+                "done_sessions": ["1", {"session_index": 0, "completed_at": ""}],
+            }
+            path.write_text(json.dumps(hand_written), encoding="utf-8")
+            loaded_by_hand = {}
+            for name, disabled in backends.items():
+                with mock.patch.multiple("routinely", **disabled):
+                    loaded_by_hand[name] = _load_practice_log(path, 3).to_json()
+        self.assertEqual(loaded["stdlib"], log.to_json())
+        self.assertEqual(loaded["orjson"], log.to_json())
+        self.assertEqual(loaded["msgspec"], log.to_json())
+        self.assertEqual(loaded_by_hand["orjson"], loaded_by_hand["stdlib"])
+        self.assertEqual(loaded_by_hand["msgspec"], loaded_by_hand["stdlib"])
+        self.assertEqual(
+            [entry["notes"] for entry in loaded_by_hand["stdlib"]["entries"]],
+            ["Tempo 80bpm", "80"],
+        )
+
+    def test_compressed_log_and_plan_round_trip(self) -> None:
+        config_path = self._write_config(
+            {"options": ["A", "B"], "items_per_session": 1, "max_gap": 1, "sessions": 2}
+        )
+        log = PracticeLog(2)
+        log.add_entry(1, "Compressed notes", datetime.datetime(2024, 1, 1))
+        with tempfile.TemporaryDirectory() as directory:
+            for suffix in (".gz", ".bz2", ".xz"):
+                log_path = Path(directory) / f"log.json{suffix}"
+                plan_path = Path(directory) / f"plan.json{suffix}"
+
+                _save_practice_log(log_path, log)
+                _write_plan_json(plan_path, [["A"], ["B"]], {"A": 1}, "Jan", config_path)
+
+                self.assertNotEqual(log_path.read_bytes()[:1], b"{")
+                loaded = _load_practice_log(log_path, 2)
+                self.assertEqual(loaded.entries_for(1)[0]["notes"], "Compressed notes")
+                plan_data = _read_plan_json(plan_path, config_path, 2, "testing")
+                self.assertEqual(plan_data["plan"], [["A"], ["B"]])
+
+    def test_corrupt_gzip_body_is_a_read_error(self) -> None:
+        log = PracticeLog(2)
+        log.add_entry(0, "Compressed notes", datetime.datetime(2024, 1, 1))
+        with tempfile.TemporaryDirectory() as directory:
+            log_path = Path(directory) / "log.json.gz"
+            _save_practice_log(log_path, log)
+            payload = bytearray(log_path.read_bytes())
+            # Keep the 10-byte header valid and scramble the deflate stream.
+            payload[10:20] = b"\xff" * 10
+            log_path.write_bytes(bytes(payload))
+
+            with self.assertRaises(SystemExit) as raised:
+                _load_practice_log(log_path, 2)
+
+        self.assertIn("Failed to read log file", str(raised.exception))
+
+    def test_corrupt_zstd_log_fails_like_other_codecs(self) -> None:
+        class ZstdError(Exception):
+            pass
+
+        class ZstdDecompressor:
+            def decompress(self, payload: bytes) -> bytes:
+                raise ZstdError("unknown frame descriptor")
+
+        fake_zstandard = types.SimpleNamespace(
+            ZstdError=ZstdError, ZstdDecompressor=ZstdDecompressor
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            log_path = Path(directory) / "log.json.zst"
+            log_path.write_bytes(b"not zstd")
+
+            with mock.patch("routinely.zstandard", fake_zstandard):
+                with self.assertRaises(SystemExit) as raised:
+                    _load_practice_log(log_path, 2)
+
+        self.assertIn("Failed to read log file", str(raised.exception))
+        self.assertIn("unknown frame descriptor", str(raised.exception))
+
     def test_write_plan_json_includes_config_hash(self) -> None:
         config_data = {
             "options": ["A", "B"],
@@ -199,6 +574,171 @@ class RoutinelyTests(unittest.TestCase):
         self.assertTrue(loaded.is_done(1))
         self.assertIsNotNone(loaded.done_at(1))
 
+    def test_handle_log_import_reports_bad_rows(self) -> None:
+        config = {
+            "options": ["X", "Y"],
+            "items_per_session": 1,
+            "max_gap": 1,
+            "sessions": 2,
+        }
+        config_path = self._write_config(config)
+        with tempfile.TemporaryDirectory() as directory:
+            import_path = Path(directory) / "notes.csv"
+            import_path.write_text(
+                "session,notes,logged_at\n"
+                "1,Warmup,2024-01-01T10:00:00\n"
+                "3,Out of range,\n"
+                "2,Cooldown,\n",
+                encoding="utf-8",
+            )
+            log_path = Path(directory) / "log.json"
+            args = mock.Mock(
+                config=config_path,
+                log_file=str(log_path),
+                plan_json=None,
+                log_command="import",
+                path=str(import_path),
+                format=None,
+            )
+
+            with mock.patch("builtins.print") as printed:
+                result = _handle_log(args)
+
+            self.assertEqual(result, 1)
+            self.assertIn("row 3:", printed.call_args_list[0].args[0])
+            loaded = _load_practice_log(log_path, 2)
+            self.assertEqual(
+                [entry["notes"] for entry in loaded.all_entries()],
+                ["Warmup", "Cooldown"],
+            )
+            self.assertEqual(
+                loaded.entries_for(0)[0]["logged_at"],
+                datetime.datetime(2024, 1, 1, 10, 0, 0),
+            )
+
+    def test_handle_log_import_checks_logged_at_per_row(self) -> None:
+        config_path = self._write_config(
+            {"options": ["X", "Y"], "items_per_session": 1, "max_gap": 1, "sessions": 2}
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            import_path = Path(directory) / "notes.jsonl"
+            import_path.write_text(
+                '{"session": 1, "notes": "Warmup", "logged_at": 20240101}\n'
+                '{"session": 1, "notes": "Scales", "logged_at": "yesterday"}\n'
+                '{"session": 2, "notes": "Chords",'
+                ' "logged_at": "2024-01-01T10:00:00+00:00"}\n',
+                encoding="utf-8",
+            )
+            log_path = Path(directory) / "log.json"
+            args = mock.Mock(
+                config=config_path,
+                log_file=str(log_path),
+                plan_json=None,
+                log_command="import",
+                path=str(import_path),
+                format=None,
+            )
+
+            with mock.patch("builtins.print") as printed:
+                result = _handle_log(args)
+
+            self.assertEqual(result, 1)
+            messages = [call.args[0] for call in printed.call_args_list]
+            self.assertTrue(any("row 1: logged_at" in line for line in messages))
+            self.assertTrue(any("row 2: logged_at" in line for line in messages))
+            loaded = _load_practice_log(log_path, 2)
+            (entry,) = loaded.all_entries()
+            self.assertEqual(
+                entry["logged_at"],
+                datetime.datetime(2024, 1, 1, 10, tzinfo=datetime.timezone.utc)
+                .astimezone()
+                .replace(tzinfo=None),
+            )
+
+    def test_log_archive_rotates_and_history_opens_only_needed_segments(self) -> None:
+        config_path = self._write_config(
+            {"options": ["X", "Y"], "items_per_session": 1, "max_gap": 1, "sessions": 2}
+        )
+        log_path = Path(config_path).with_suffix(".practice_log.json")
+        archive_dir = Path(config_path).with_suffix(".practice_log.archive")
+        self.addCleanup(lambda: shutil.rmtree(archive_dir, ignore_errors=True))
+        self.addCleanup(lambda: log_path.unlink(missing_ok=True))
+
+        for month in (1, 2):
+            log = _load_practice_log(log_path, 2)
+            log.add_entry(0, f"month {month} scales", datetime.datetime(2024, month, 3))
+            log.mark_done(1, datetime.datetime(2024, month, 4))
+            _save_practice_log(log_path, log)
+            with mock.patch("builtins.print"):
+                main(["log", config_path, "archive"])
+        log = _load_practice_log(log_path, 2)
+        self.assertEqual(log.all_entries(), [])
+        self.assertEqual(log.next_id, 3)
+
+        manifest = json.loads((archive_dir / "manifest.json").read_text())
+        self.assertEqual([seg["session_range"] for seg in manifest], [[0, 1]] * 2)
+        self.assertEqual(
+            manifest[1]["time_span"], ["2024-02-03T00:00:00", "2024-02-04T00:00:00"]
+        )
+
+        printed: list = []
+        with mock.patch("builtins.print", printed.append):
+            main(["log", config_path, "list", "--archived", "--since", "2024-02-01"])
+        self.assertTrue(printed[0].startswith("Archive segment-0002.json.xz"))
+        self.assertIn("month 2 scales", printed[1])
+        self.assertEqual(printed[2], "(Searched 1 of 2 archive segments.)")
+
+        printed.clear()
+        with mock.patch("builtins.print", printed.append):
+            main(["log", config_path, "search", "scales", "--archived"])
+        matches = [line for line in printed if "scales" in line]
+        self.assertEqual(len(matches), 2)
+        self.assertIn("(Searched 2 of 2 archive segments.)", printed)
+
+    def test_log_list_accepts_utc_offsets_in_bounds_and_log(self) -> None:
+        config_path = self._write_config(
+            {"options": ["X", "Y"], "items_per_session": 1, "max_gap": 1, "sessions": 2}
+        )
+        log_path = Path(config_path).with_suffix(".practice_log.json")
+        self.addCleanup(lambda: log_path.unlink(missing_ok=True))
+        log_path.write_text(
+            json.dumps(
+                {
+                    "entries": [
+                        {
+                            "entry_id": 1,
+                            "session_index": 0,
+                            "notes": "tagged",
+                            "logged_at": "2024-01-05T12:00:00+00:00",
+                        },
+                        {
+                            "entry_id": 2,
+                            "session_index": 1,
+                            "notes": "naive",
+                            "logged_at": "2023-12-20T12:00:00",
+                        },
+                    ],
+                    "done_sessions": [
+                        {"session_index": 0, "completed_at": "2024-01-05T13:00:00Z"}
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        printed: list = []
+        with mock.patch("builtins.print", printed.append):
+            main(
+                ["log", config_path, "list", "--since", "2024-01-01T00:00:00+00:00"]
+            )
+
+        self.assertEqual(len(printed), 1)
+        self.assertIn("tagged", printed[0])
+        log = _load_practice_log(log_path, 2)
+        self.assertIsNone(log.done_at(0).tzinfo)
+        new_year = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        self.assertEqual(log.entries_between(end=new_year), log.entries_for(1))
+
     def test_handle_render_marks_done_in_markdown(self) -> None:
         config = {
             "options": ["X", "Y"],
@@ -241,6 +781,10 @@ class RoutinelyTests(unittest.TestCase):
             plan_json=plan_path.name,
             log_file=log_path.name,
             markdown=output_markdown.name,
+            html=None,
+            csv=None,
+            text=None,
+            watch=False,
         )
 
         result = _handle_render(args)
@@ -250,6 +794,233 @@ class RoutinelyTests(unittest.TestCase):
             content = handle.read()
         self.assertIn("| 01 | 2024-01-01 | X |  |  |  | **X** |", content)
 
+    def test_watch_render_debounces_log_changes(self) -> None:
+        config_path = self._write_config(
+            {"options": ["X", "Y"], "items_per_session": 1, "max_gap": 1, "sessions": 2}
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            plan_path = Path(directory) / "plan.json"
+            log_path = Path(directory) / "log.json"
+            markdown_path = Path(directory) / "plan.md"
+            _write_plan_json(plan_path, [["X"], ["Y"]], {"X": 1, "Y": 1}, "Jan", config_path)
+            log = PracticeLog(2)
+            _save_practice_log(log_path, log)
+
+            def fake_sleep(seconds: float) -> None:
+                # Two quick log writes arrive, then the files settle.
+                if fake_sleep.calls < 2:
+                    log.mark_done(fake_sleep.calls, datetime.datetime(2024, 1, 1))
+                    _save_practice_log(log_path, log)
+                fake_sleep.calls += 1
+
+            fake_sleep.calls = 0
+            args = mock.Mock(
+                config=config_path,
+                plan_json=str(plan_path),
+                log_file=str(log_path),
+                markdown=str(markdown_path),
+                html=None,
+                csv=None,
+                text=None,
+                interval=1.0,
+                debounce=0.5,
+            )
+
+            with mock.patch("builtins.print") as printed:
+                result = _watch_render(args, sleep=fake_sleep, max_renders=2)
+
+            self.assertEqual(result, 0)
+            writes = [
+                call for call in printed.call_args_list if "Wrote" in call.args[0]
+            ]
+            self.assertEqual(len(writes), 2)
+            content = markdown_path.read_text(encoding="utf-8")
+            self.assertIn("| 01 | 2024-01-01 | X |  |  |  | **X** |", content)
+            self.assertIn("| 02 | 2024-01-01 | Y |  |  |  | **X** |", content)
+
+    def test_tui_state_redraws_touched_rows_and_saves_in_background(self) -> None:
+        plan = [[f"Item {index}"] for index in range(30)]
+        log = PracticeLog(len(plan))
+        lock = threading.Lock()
+        with tempfile.TemporaryDirectory() as directory:
+            log_path = Path(directory) / "routine.practice_log.json"
+            saver = _BackgroundSaver(log_path, log, lock, delay=0)
+            state = _TuiState(plan, log, lock, saver)
+            state.full_redraw = False
+
+            state.move(1, rows_visible=10)
+            self.assertEqual(state.dirty_rows, {0, 1})
+            state.dirty_rows.clear()
+            state.mark_done()
+            state.add_note("  slow practice ")
+            self.assertEqual(state.dirty_rows, {1})
+            self.assertFalse(state.full_redraw)
+            self.assertEqual(state.row_text(1), "> 02 [X] Item 1  (1 note)")
+
+            state.move(12, rows_visible=10)
+            self.assertTrue(state.full_redraw)
+            self.assertEqual(state.top, 4)
+            saver.close()
+
+            saved = _load_practice_log(log_path, len(plan))
+        self.assertTrue(saved.is_done(1))
+        self.assertEqual([e["notes"] for e in saved.entries_for(1)], ["slow practice"])
+        self.assertGreaterEqual(saver.saves, 1)
+
+    def test_render_table_formats_share_rows(self) -> None:
+        table = _build_render_table(
+            [["Scales", "<Etudes>"], ["Chords"]],
+            {"Scales": 1, "<Etudes>": 1, "Chords": 1},
+            "January 01 2024",
+            done_marks={1: datetime.datetime(2024, 1, 2, 8, 0, 0)},
+        )
+
+        csv_lines = _table_to_csv(table).splitlines()
+        self.assertEqual(
+            csv_lines[0], "Session,Date,Item 1,Item 2,Item 3,Item 4,Done"
+        )
+        self.assertEqual(csv_lines[2], "02,2024-01-02,Chords,,,,X")
+        self.assertIn("<td>&lt;Etudes&gt;</td>", _table_to_html(table))
+        text_lines = _table_to_text(table).splitlines()
+        self.assertEqual(text_lines[5], "01" + " " * 19 + "Scales  <Etudes>")
+        self.assertTrue(text_lines[6].startswith("02       2024-01-02  Chords"))
+
+    def test_handle_generate_batch_writes_plan_per_config(self) -> None:
+        config = {
+            "options": ["X", "Y", "Z"],
+            "items_per_session": 2,
+            "max_gap": 1,
+            "sessions": 3,
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("one", "two"):
+                with open(Path(directory) / f"{name}.json", "w", encoding="utf-8") as handle:
+                    json.dump(config, handle)
+            for sidecar in ("one.cursor.json", "one.sync.json"):
+                (Path(directory) / sidecar).write_text("{}", encoding="utf-8")
+            args = mock.Mock(
+                config=[directory],
+                seed=7,
+                markdown=None,
+                plan_json=None,
+                markdown_dir=None,
+                compact_json=False,
+                rebase=False,
+                jobs=2,
+            )
+
+            with mock.patch("builtins.print"):
+                result = _handle_generate(args)
+
+            self.assertEqual(result, 0)
+            plans = []
+            for name in ("one", "two"):
+                with open(Path(directory) / f"{name}.plan.json", encoding="utf-8") as handle:
+                    plans.append(json.load(handle)["plan"])
+            # Identical configs derive the same seed, so the plans match.
+            self.assertEqual(plans[0], plans[1])
+            self.assertEqual(len(plans[0]), 3)
+
+    def test_handle_generate_batch_reports_unexpected_errors_per_config(self) -> None:
+        config = {"options": ["X", "Y"], "items_per_session": 1, "max_gap": 1}
+        with tempfile.TemporaryDirectory() as directory:
+            good_path = Path(directory) / "good.json"
+            good_path.write_text(json.dumps({**config, "sessions": 2}))
+            bad_path = Path(directory) / "bad.json"
+            bad_config = {**config, "options": [1, 2], "sessions": 2}
+            bad_path.write_text(json.dumps(bad_config))
+            args = mock.Mock(
+                config=[directory],
+                seed=7,
+                markdown=None,
+                plan_json=None,
+                markdown_dir=None,
+                compact_json=False,
+                rebase=False,
+                jobs=2,
+            )
+
+            printed: list = []
+            with mock.patch("builtins.print", printed.append):
+                result = _handle_generate(args)
+
+            self.assertEqual(result, 1)
+            failed = [line for line in printed if "FAILED" in line]
+            self.assertEqual(len(failed), 1)
+            self.assertIn("bad.json: FAILED (TypeError", failed[0])
+            self.assertTrue(Path(directory, "good.plan.json").exists())
+
+    def test_rebase_plan_keeps_completed_sessions(self) -> None:
+        options = ["A", "B", "C", "D"]
+        config = {
+            "options": options,
+            "items_per_session": 2,
+            "max_gap": 2,
+            "sessions": 6,
+        }
+        old_plan, _ = _build_plan(options, 2, 2, 6, random.Random(3))
+        config["options"] = options + ["E"]
+
+        plan, picks = _rebase_plan(config, old_plan, 3, random.Random(4))
+
+        self.assertEqual(plan[:3], old_plan[:3])
+        self.assertEqual(len(plan), 6)
+        self.assertEqual(sum(picks.values()), 12)
+        # The new option is due straight away and then respects max_gap.
+        self.assertIn("E", plan[3])
+        self.assertEqual(_plan_diff(old_plan, old_plan), [])
+        self.assertEqual(
+            _plan_diff([["A"]], [["B"]]), ["Session 01:", "  - A", "  + B"]
+        )
+
+    def test_rebase_plan_staggers_more_new_options_than_fit_a_session(self) -> None:
+        config = {
+            "options": ["A", "B", "C", "D", "E", "F", "G"],
+            "items_per_session": 2,
+            "max_gap": 3,
+            "sessions": 8,
+        }
+        old_plan, _ = _build_plan(["A", "B", "C", "D"], 2, 3, 8, random.Random(1))
+
+        plan, _ = _rebase_plan(config, old_plan, 4, random.Random(2))
+
+        self.assertEqual(plan[:4], old_plan[:4])
+        for option in config["options"]:
+            # Kept options count from their last kept pick, new ones from the rebase.
+            hits = [i for i, row in enumerate(plan) if option in row]
+            previous = max([i for i in hits if i < 4], default=3)
+            later = [i for i in hits if i >= 4]
+            gaps = [b - a - 1 for a, b in zip([previous] + later, later + [8])]
+            self.assertLessEqual(max(gaps), 3, option)
+
+    def test_routine_store_resolves_user_plans_for_cli(self) -> None:
+        config_path = self._write_config(
+            {"options": ["X", "Y"], "items_per_session": 1, "max_gap": 1, "sessions": 2}
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            store = RoutineStore(Path(directory))
+            store.add_plan("alice", "jan", Path(config_path))
+            store.add_plan("alice", "feb", Path(config_path), activate=False)
+            self.assertEqual(store.plans("alice"), ["feb", "jan"])
+            self.assertEqual(store.active_plan("alice"), "jan")
+            with self.assertRaises(ValueError):
+                store.resolve("alice", "mar")
+            with self.assertRaises(ValueError):
+                store.add_plan("../bob", "jan", Path(config_path))
+            store.close()
+
+            routine = ["--store", directory, "--user", "alice"]
+            with mock.patch("builtins.print"):
+                main(["generate", *routine, "--seed", "1"])
+                main(["log", *routine, "done", "--session", "2"])
+
+            store = RoutineStore(Path(directory))
+            self.addCleanup(store.close)
+            paths = store.resolve("alice")
+            self.assertTrue(paths["plan_json"].exists())
+            self.assertTrue(_load_practice_log(paths["log_file"], 2).is_done(1))
+            self.assertEqual(paths["config"].parent.name, "jan")
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()